@@ -0,0 +1,72 @@
+import ast
+import hashlib
+from algorithms.extra_features import extract_file_features, extract_cpp_file_features
+from algorithms.cpp_lexer import function_spans
+
+
+class SubmissionArtifacts:
+    """
+    Everything the pairwise metrics need from one submission, computed in a single pass:
+    the parsed tree, the function hashes, the normalized token ids and the per-file
+    features (including radon's complexity, computed from the same tree).
+    C++ submissions have no tree; their functions are segmented by braces instead. Python
+    code that does not parse has no tree either, and no function hashes.
+    """
+
+    def __init__(self, code, ast_comparator, tokenizer, language='python'):
+        self.code = code
+        self.length = len(code)
+        self.language = language
+        if language == 'cpp':
+            raw_tokens = tokenizer.lex(code, language)
+            spans = function_spans(raw_tokens)
+            self.tree = None
+            self.function_hashes = ast_comparator.function_hashes_from_tokens(raw_tokens, spans)
+            self.tokens = tokenizer.vocabulary.encode(tokenizer.normalize(raw_tokens, language))
+            self.features = extract_cpp_file_features(code, raw_tokens, spans)
+        else:
+            # Code that does not parse has no tree and no functions; the lexer never raises,
+            # so the token metrics still compare it
+            try:
+                self.tree = ast.parse(code)
+            except (SyntaxError, ValueError):  # ValueError: null bytes in the source
+                self.tree = None
+            self.function_hashes = ast_comparator.function_hashes_from_tree(self.tree) if self.tree else []
+            self.tokens = tokenizer.token_ids(code)
+            self.features = extract_file_features(code, self.tree)
+
+    def __getstate__(self):
+        # The metrics only need what was derived from the tree, so it is not pickled
+        state = self.__dict__.copy()
+        state['tree'] = None
+        return state
+
+
+class ArtifactCache:
+    """
+    Submission artifacts keyed by a hash of the file content, so every distinct
+    submission is parsed and tokenized once.
+    """
+
+    def __init__(self, ast_comparator, tokenizer):
+        self.ast_comparator = ast_comparator
+        self.tokenizer = tokenizer
+        self.records = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, code, key=None, language='python'):
+        # The caller may pass a content hash it already has, e.g. from the file reader
+        if key is None:
+            key = hashlib.sha1(code.encode('utf-8')).hexdigest()
+        record = self.records.get(key)
+        if record is None:
+            self.misses += 1
+            record = self.records[key] = SubmissionArtifacts(code, self.ast_comparator, self.tokenizer, language)
+        else:
+            self.hits += 1
+        return record
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
@@ -1,22 +1,74 @@
 import ast
-import astunparse
 import hashlib
+import tokenize
+
+# (field, replacement) pairs encoded for each node type, filled on first use
+_ENCODED_FIELDS = {}
+
+
+def _encoded_fields(node_type):
+    fields = []
+    for field in node_type._fields:
+        if field == 'type_comment':
+            continue
+        renamed = None
+        if field == 'id' and node_type is ast.Name:
+            renamed = repr("_var")  # Normalize variable names
+        elif field == 'name' and node_type is ast.FunctionDef:
+            renamed = repr("_func")  # Normalize function names
+        fields.append((field, renamed))
+    return tuple(fields)
 
 
 class ASTComparator:
     def normalize_ast(self, code):
-        tree = ast.parse(code)
-        normalized_tree = self._normalize_tree(tree)
-        return astunparse.unparse(normalized_tree)
-
-    def _normalize_tree(self, node):
-        for child in ast.iter_child_nodes(node):
-            if isinstance(child, ast.Name):
-                child.id = "_var"
-            elif isinstance(child, ast.FunctionDef):
-                child.name = "_func"
-            self._normalize_tree(child)
-        return node
+        """
+        Returns the canonical byte encoding of the code's normalized tree (see canonical_encoding).
+        """
+        return self.canonical_encoding(ast.parse(code))
+
+    def canonical_encoding(self, tree):
+        """
+        Serializes a tree depth-first without generating source: every node as its type
+        followed by its fields, every list as its length and items, and every other value as
+        its repr. Variable names become "_var" and function names "_func"; positions and type
+        comments are left out, as they were in the unparsed source this replaces, while the
+        literal kind is kept, as the unparsed source kept u'' prefixes. Iterative, so deeply
+        nested code cannot hit the recursion limit; the tree is not modified.
+        """
+        parts = []
+        append = parts.append
+        stack = [tree]
+        push = stack.append
+        while stack:
+            item = stack.pop()
+            node_type = type(item)
+            if node_type is str:
+                append(item)
+                continue
+
+            fields = _ENCODED_FIELDS.get(node_type)
+            if fields is None:
+                fields = _ENCODED_FIELDS[node_type] = _encoded_fields(node_type)
+            append(node_type.__name__)
+            # Children are popped last field first; the encoding stays unambiguous either way
+            for field, renamed in fields:
+                if renamed is not None:
+                    push(renamed)
+                    continue
+                value = getattr(item, field, None)
+                if type(value) is list:
+                    push(f'[{len(value)}')
+                    for child in value:
+                        push(child if isinstance(child, ast.AST) else repr(child))
+                else:
+                    push(value if isinstance(value, ast.AST) else repr(value))
+
+        return '\x00'.join(parts).encode('utf-8')
+
+    def normalized_hash(self, code):
+        """Hash of the canonical encoding; equal hashes mean equal normalized trees."""
+        return hashlib.blake2b(self.normalize_ast(code), digest_size=16).hexdigest()
 
     def compare_ast(self, code1, code2):
         normalized_code1 = self.normalize_ast(code1)
@@ -37,7 +89,12 @@ class ASTComparator:
         """
         Extracts and returns a sorted list of hashes for all functions in the code.
         """
-        tree = ast.parse(code)
+        return self.function_hashes_from_tree(ast.parse(code))
+
+    def function_hashes_from_tree(self, tree):
+        """
+        Same as extract_function_hashes, for an already parsed tree.
+        """
         function_hashes = []
 
         for node in ast.walk(tree):
@@ -47,13 +104,75 @@ class ASTComparator:
 
         return sorted(function_hashes)
 
+    def function_hashes_from_tokens(self, tokens, spans):
+        """
+        C++ counterpart of function_hashes_from_tree: hashes the tokens of every function
+        span without comments, the way ast.dump ignores formatting and comments.
+        """
+        function_hashes = []
+
+        for start, end in spans:
+            function_text = '\x00'.join(string for token_type, string in tokens[start:end]
+                                         if token_type != tokenize.COMMENT)
+            function_hashes.append(hashlib.md5(function_text.encode()).hexdigest())
+
+        return sorted(function_hashes)
+
+    def subtree_hashes(self, tree, min_size=5):
+        """
+        Normalized structural hash of every subtree with at least min_size nodes, computed
+        bottom-up in a single pass: each node hashes its type, its fields and the hashes of
+        its children, with identifiers, function names and constant values left out.
+        Returns (hash, size, (lineno, col_offset)) triples.
+        """
+        digests = {}  # id(node) -> (digest, size) of every finished node
+        subtrees = []
+        stack = [(tree, False)]
+
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in ast.iter_child_nodes(node))
+                continue
+
+            node_hash = hashlib.blake2b(type(node).__name__.encode(), digest_size=8)
+            size = 1
+            for field, value in ast.iter_fields(node):
+                children = value if isinstance(value, list) else [value]
+                node_hash.update(f'|{field}:{len(children)}'.encode())
+                for child in children:
+                    if isinstance(child, ast.AST):
+                        child_digest, child_size = digests[id(child)]
+                        node_hash.update(child_digest)
+                        size += child_size
+                    else:
+                        node_hash.update(self._normalized_value(node, field, child).encode())
+            digest = node_hash.digest()
+            digests[id(node)] = (digest, size)
+            if size >= min_size:
+                subtrees.append((digest, size, (getattr(node, 'lineno', None), getattr(node, 'col_offset', None))))
+
+        return subtrees
+
+    def _normalized_value(self, node, field, value):
+        # Attribute, keyword and module names are kept: they name library APIs, not student choices
+        if isinstance(node, ast.Constant):
+            return type(value).__name__ if field == 'value' else ''
+        if isinstance(node, (ast.Attribute, ast.keyword, ast.alias, ast.ImportFrom)):
+            return f'{value}' if field in ('attr', 'arg', 'name', 'module', 'level') else ''
+        return ''
+
     def compare_functions(self, code1, code2):
         """
         Compares the function hashes between two pieces of code.
         """
-        hashes1 = self.extract_function_hashes(code1)
-        hashes2 = self.extract_function_hashes(code2)
+        return self.compare_function_hashes(self.extract_function_hashes(code1), self.extract_function_hashes(code2))
 
+    def compare_function_hashes(self, hashes1, hashes2):
+        """
+        Compares two precomputed lists of function hashes.
+        """
         if len(hashes1) == 0 or len(hashes2) == 0:
             return 0
 
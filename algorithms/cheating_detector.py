@@ -1,102 +1,504 @@
 import os
-import joblib
+import numpy as np
 import pandas as pd
 from Utils.file_reader import FileReader
-from algorithms.similarity_detector import SimilarityDetector
+from algorithms.similarity_detector import SimilarityDetector, TEXT_THRESHOLD, text_similarity
 from algorithms.ast_comparator import ASTComparator
-from algorithms.tokenizer import EnhancedTokenizer
+from algorithms.tokenizer import EnhancedTokenizer, language_of
 from algorithms.levenshtein import similarity_score as levenshtein_similarity
-from algorithms.extra_features import extract_extra_features  # Import the new module
+from algorithms.extra_features import combine_file_features  # Import the new module
+from algorithms.artifacts import ArtifactCache
+from algorithms.results import PairResult, ResultSet, PairScores
+from algorithms.parallel_scoring import scoring_pool, score_pairs_parallel
+from algorithms.compiled_model import CompiledModel, COMPILED_MODEL_PATH
+from algorithms.run_state import RunState
+from algorithms.score_cache import PairScoreCache, METRIC_VERSIONS
+from algorithms.greedy_string_tiling import GreedyStringTiler
+
+# Feature order expected by the scaler and the model
+FEATURE_COLUMNS = [
+    'AST Similarity',
+    'Token Similarity',
+    'Levenshtein Similarity',
+    'Length File 1',
+    'Length File 2',
+    'Function Count File 1',
+    'Function Count File 2',
+    'Variable Count File 1',
+    'Variable Count File 2',
+    'Comment Ratio File 1',
+    'Comment Ratio File 2',
+    'Cyclomatic Complexity File 1',
+    'Cyclomatic Complexity File 2'
+]
+
+# Weights of the text, AST, token and Levenshtein scores in the overall score, and the
+# overall score a pair must exceed to be flagged
+DEFAULT_WEIGHTS = (0.1, 0.2, 0.5, 0.2)
+DEFAULT_THRESHOLD = 0.60
 
 
 class CheatingDetector:
-    def __init__(self, directory):
+    def __init__(self, directory, candidate_mode='all', lsh_bands=16, lsh_rows=4,
+                 winnowing_k=5, winnowing_window=4, winnowing_max_postings=10, subtree_min_size=5,
+                 subtree_max_postings=10, workers=1, chunk_size=64,
+                 state_path=None, score_cache_path=None, token_metric='positional', gst_min_match=5,
+                 batch_size=256, weights=DEFAULT_WEIGHTS, threshold=DEFAULT_THRESHOLD, prune_levenshtein=True):
         self.reader = FileReader(directory)
         self.similarity_detector = None
+        self.candidate_mode = candidate_mode  # 'all' pairs, 'lsh', 'winnowing' or 'subtree' candidate generation
+        self.lsh_bands = lsh_bands
+        self.lsh_rows = lsh_rows
+        self.winnowing_k = winnowing_k
+        self.winnowing_window = winnowing_window
+        self.winnowing_max_postings = winnowing_max_postings
+        self.subtree_min_size = subtree_min_size
+        self.subtree_max_postings = subtree_max_postings
+        self.workers = workers or os.cpu_count()  # Number of scoring processes, None uses every core
+        self.chunk_size = chunk_size  # Candidate pairs sent to a worker at a time
+        self.batch_size = batch_size  # New pairs scored between progress reports and cancellation checks
         self.ast_comparator = ASTComparator()
         self.tokenizer = EnhancedTokenizer()
         self.levenshtein_similarity = levenshtein_similarity
-        self.detailed_results = []
 
-        # Load the machine learning model and scaler
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        self.model = joblib.load(os.path.join(current_dir, 'ML', 'cheating_detector_model.pkl'))
-        self.scaler = joblib.load(os.path.join(current_dir, 'ML', 'scaler.pkl'))
+        # Scoring of the runs; rescore() applies other weights and thresholds afterwards
+        self.weights = tuple(weights)
+        self.threshold = threshold
+        self.pair_scores = None  # PairScores of the last run
+        # Pruning skips the exact Levenshtein distance of pairs that cannot pass the threshold;
+        # rescore() then computes it for pruned pairs that could pass other weights or thresholds.
+        # Without it every stored score is exact and rescore() never computes anything
+        self.prune_levenshtein = prune_levenshtein
+
+        # 'positional' compares tokens at equal positions, as the model was trained on;
+        # 'gst' uses Greedy String Tiling coverage, which survives inserted and moved code. It is
+        # quadratic on highly repetitive files, where every window recurs once per period: two
+        # 4.9k-token files repeating a 7-token statement take about 0.8s per pair
+        if token_metric not in ('positional', 'gst'):
+            raise ValueError(f"Unknown token metric: {token_metric}")
+        self.token_metric = token_metric
+        self.gst_tiler = GreedyStringTiler(min_match=gst_min_match)
+        self.artifact_cache = ArtifactCache(self.ast_comparator, self.tokenizer)  # Parsed once per submission
+        self.detailed_results = ResultSet()
+        self.results_fingerprint = None  # Folder fingerprint the detailed results belong to
+
+        # Artifacts and pair outcomes of earlier runs; persisted between sessions when state_path is set
+        self.state_path = state_path
+        self.run_state = RunState.load(state_path)
+        self.run_state.use_settings({'token_metric': token_metric, 'gst_min_match': gst_min_match})
+        self.artifact_cache.records = self.run_state.artifacts
+        self.tokenizer.vocabulary = self.run_state.vocabulary
+
+        # Metric values per pair of contents, shared by every folder that uses the same cache file
+        self.score_cache = PairScoreCache(score_cache_path) if score_cache_path else None
 
-    def analyze(self):
+        # Load the machine learning model and scaler. The compiled NumPy export gives the same
+        # predictions without importing xgboost; the pickles are only needed when it is missing.
+        self.compiled_model = None
+        self.model = None
+        self.scaler = None
+        if os.path.exists(COMPILED_MODEL_PATH):
+            self.compiled_model = CompiledModel.load(COMPILED_MODEL_PATH)
+        else:
+            import joblib
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            self.model = joblib.load(os.path.join(current_dir, 'ML', 'cheating_detector_model.pkl'))
+            self.scaler = joblib.load(os.path.join(current_dir, 'ML', 'scaler.pkl'))
+
+    def analyze(self, progress=None, on_result=None, should_cancel=None):
+        """
+        Scores the folder and returns the flagged pairs as a ResultSet. Long runs can be
+        followed and stopped: after each batch of new pairs, progress(done, total) gets the
+        number of candidate pairs decided so far, on_result(pair_result) every pair the batch
+        flagged, and should_cancel() is asked whether to stop. A cancelled run returns the
+        pairs flagged so far.
+        """
         try:
-            files = self.reader.read_files()
+            self.results_fingerprint = None
+            self.similarity_detector = SimilarityDetector(mode=self.candidate_mode,
+                                                          lsh_bands=self.lsh_bands, lsh_rows=self.lsh_rows,
+                                                          winnowing_k=self.winnowing_k,
+                                                          winnowing_window=self.winnowing_window,
+                                                          winnowing_max_postings=self.winnowing_max_postings,
+                                                          subtree_min_size=self.subtree_min_size,
+                                                          subtree_max_postings=self.subtree_max_postings)
+
+            # Fingerprint each file as soon as it has been read
+            for filename, code in self.reader.iter_files():
+                self.similarity_detector.add_file(filename, code)
+            self.similarity_detector.set_order(self.reader.names)
+            files = self.similarity_detector.files
+            print(f"Total files read: {len(files)}")
             if not files:
                 print("No files found for analysis.")
-                return []
-
-            self.similarity_detector = SimilarityDetector(files)
-            results = self.similarity_detector.detect_similarities()
-
-            enhanced_results = []
-            for file1, file2, text_sim_score in results:
-                # Debug output
-                print(f"Comparing {file1} and {file2}")
-
-                ast_sim_score = self.ast_comparator.compare_functions(files[file1], files[file2])
-                token_sim_score = self.tokenizer.compare_tokens(files[file1], files[file2])
-                lev_sim_score = self.levenshtein_similarity(files[file1], files[file2])
-
-                # Extract additional features
-                extra_features = extract_extra_features(files[file1], files[file2])
-
-                # Combine all features into a DataFrame
-                features_df = pd.DataFrame({
-                    'AST Similarity': [ast_sim_score],
-                    'Token Similarity': [token_sim_score],
-                    'Levenshtein Similarity': [lev_sim_score],
-                    'Length File 1': [len(files[file1])],
-                    'Length File 2': [len(files[file2])],
-                    'Function Count File 1': [extra_features['Function Count File 1']],
-                    'Function Count File 2': [extra_features['Function Count File 2']],
-                    'Variable Count File 1': [extra_features['Variable Count File 1']],
-                    'Variable Count File 2': [extra_features['Variable Count File 2']],
-                    'Comment Ratio File 1': [extra_features['Comment Ratio File 1']],
-                    'Comment Ratio File 2': [extra_features['Comment Ratio File 2']],
-                    'Cyclomatic Complexity File 1': [extra_features['Cyclomatic Complexity File 1']],
-                    'Cyclomatic Complexity File 2': [extra_features['Cyclomatic Complexity File 2']]
-                })
-
-                # Scale features
-                scaled_features = self.scaler.transform(features_df)
-
-                # Predict cheating using the ML model
-                ml_prediction = self.model.predict(scaled_features)[0]
-
-                overall_score = (
-                        0.1 * text_sim_score +
-                        0.2 * ast_sim_score +
-                        0.5 * token_sim_score +
-                        0.2 * lev_sim_score
-                )
-
-                if overall_score > 0.60 and ml_prediction == 1:
-                    enhanced_results.append((file1, file2, overall_score, ml_prediction))
-
-            self.detailed_results = enhanced_results
+                return ResultSet()
+
+            # Candidate pairs whose contents were already scored in an earlier run are reused,
+            # so after a late submission only the (new x existing) pairs are computed
+            hashes = self.reader.hashes
+            candidate_pairs = self.similarity_detector.candidate_pairs()
+            new_pairs = [(file1, file2) for file1, file2 in candidate_pairs
+                         if (hashes[file1], hashes[file2]) not in self.run_state.pairs]
+            print(f"Scoring {len(new_pairs)} new pairs, reusing {len(candidate_pairs) - len(new_pairs)}")
+
+            done = len(candidate_pairs) - len(new_pairs)
+            if on_result is not None and done:
+                reused_pairs = [(file1, file2) for file1, file2 in candidate_pairs
+                                if (hashes[file1], hashes[file2]) in self.run_state.pairs]
+                for pair_result in self.flagged_results(reused_pairs):
+                    on_result(pair_result)
+            if progress is not None:
+                progress(done, len(candidate_pairs))
+
+            # New pairs are scored batch by batch, so progress, flagged pairs and cancellation
+            # are reported while the run goes on; with several workers a batch keeps the pool busy
+            self.artifact_cache.reset_stats()
+            if self.score_cache is not None:
+                self.score_cache.reset_stats()
+            artifacts = {}
+            batch_size = self.batch_size if self.workers == 1 else max(self.batch_size,
+                                                                        8 * self.chunk_size * self.workers)
+
+            # With several workers, one pool serves every batch; its workers get the artifacts
+            # of every file of the new pairs once, when the pool starts
+            pool = None
+            if self.workers > 1 and new_pairs:
+                self.add_artifacts(artifacts, {filename for pair in new_pairs for filename in pair})
+                pool = scoring_pool(self, artifacts, self.workers)
+            cancelled = False
+            try:
+                for start in range(0, len(new_pairs), batch_size):
+                    if should_cancel is not None and should_cancel():
+                        cancelled = True
+                        break
+                    batch = new_pairs[start:start + batch_size]
+                    self.score_new_pairs(batch, artifacts, pool)
+                    done += len(batch)
+                    if on_result is not None:
+                        for pair_result in self.flagged_results(batch):
+                            on_result(pair_result)
+                    if progress is not None:
+                        progress(done, len(candidate_pairs))
+            finally:
+                if pool is not None:
+                    pool.terminate()
+                # The analysis may run on a worker thread; the next run reopens the database in its own
+                if self.score_cache is not None:
+                    self.score_cache.close()
+
+            print(f"Artifact cache: {self.artifact_cache.hits} hits, {self.artifact_cache.misses} misses")
+            if self.score_cache is not None:
+                print(f"Score cache: {self.score_cache.hits} hits, {self.score_cache.misses} misses")
+
+            # Scores and probabilities of all pairs decided so far, kept for rescore()
+            self.pair_scores = self.score_store(candidate_pairs)
+            enhanced_results = self.rescore()
+            if cancelled:
+                print(f"Analysis cancelled after {done} of {len(candidate_pairs)} pairs")
+            else:
+                self.results_fingerprint = self.reader.fingerprint(files)
+                self.run_state.prune(set(hashes.values()))
+                self.artifact_cache.records = self.run_state.artifacts
+
+            # A cancelled run is saved too, so the next run picks up where it stopped
+            if self.state_path:
+                self.run_state.save(self.state_path)
 
             return enhanced_results
         except Exception as e:
             print(f"An error occurred: {e}")
-            return []
+            return ResultSet()
+
+    def score_new_pairs(self, pairs, artifacts, pool=None):
+        """
+        Compares a batch of pairs not scored before and records their outcomes in the run
+        state: None for those below the text threshold. `artifacts` collects the per-file
+        artifacts across batches. With a pool from scoring_pool, the pairs are scored by
+        its workers.
+        """
+        files = self.similarity_detector.files
+        hashes = self.reader.hashes
+
+        # Metric values cached on disk for these pairs of contents
+        cached_metrics = {}
+        cache_names = self.cache_metric_names()
+        if self.score_cache is not None:
+            versions = {cache_name: version for cache_name, (_, version) in cache_names.items()}
+            for file1, file2 in pairs:
+                cached = self.score_cache.lookup(hashes[file1], hashes[file2], versions)
+                cached_metrics[(file1, file2)] = {cache_names[name][0]: value for name, value in cached.items()}
+
+        # Text similarity of every pair, then the other metrics and the feature row of those
+        # that clear the text threshold. The text similarity is nearly all of the work, so
+        # with a pool the whole pair goes to the workers
+        candidates = [(file1, file2, cached_metrics.get((file1, file2))) for file1, file2 in pairs]
+        if pool is None:
+            scored = [self.score_candidate(files, artifacts, *candidate) for candidate in candidates]
+        else:
+            scored = score_pairs_parallel(pool, candidates, chunk_size=self.chunk_size)
+
+        for (file1, file2), (outcome, computed_metrics) in zip(pairs, scored):
+            self.run_state.pairs[(hashes[file1], hashes[file2])] = outcome
+            if self.score_cache is not None:
+                for cache_name, (metric, version) in cache_names.items():
+                    if metric in computed_metrics:
+                        self.score_cache.put(hashes[file1], hashes[file2], cache_name, version,
+                                             computed_metrics[metric])
+        if self.score_cache is not None:
+            self.score_cache.flush()
+
+    def add_artifacts(self, artifacts, filenames):
+        """Adds the artifacts of the given files missing from `artifacts`, parsing each distinct submission once."""
+        for filename in filenames:
+            if filename not in artifacts:
+                artifacts[filename] = self.artifact_cache.get(self.similarity_detector.files[filename],
+                                                              key=self.reader.hashes[filename],
+                                                              language=language_of(filename))
+
+    def flagged_results(self, pairs):
+        """
+        Returns the ResultSet of the given pairs that the current weights and threshold and the
+        model flag; pairs not scored yet are skipped.
+        """
+        store = self.score_store(pairs)
+        return self.flagged_in(store, self.weights, self.threshold)
+
+    def score_store(self, pairs):
+        """PairScores of the given pairs that were scored, with the probabilities of the complete ones."""
+        hashes = self.reader.hashes
+        scored_pairs = []
+        outcomes = []
+        for file1, file2 in pairs:
+            outcome = self.run_state.pairs.get((hashes[file1], hashes[file2]))
+            if outcome is not None:
+                scored_pairs.append((file1, file2))
+                outcomes.append(outcome)
+
+        store = PairScores(scored_pairs, outcomes, len(FEATURE_COLUMNS))
+        complete = np.flatnonzero(~store.incomplete())
+        store.probabilities[complete] = self.predict_proba(store.features[complete])
+        return store
+
+    def rescore(self, weights=None, threshold=None):
+        """
+        Flags the pairs of the last run again with other score weights and threshold (by
+        default the detector's own) and returns them as the new detailed results. Only pairs
+        whose Levenshtein computation was cut short and that could now pass the threshold
+        are computed further (none without prune_levenshtein); everything else is vectorized
+        over the stored scores.
+        Pairs below the text threshold were never scored and cannot be flagged.
+        """
+        if self.pair_scores is None:
+            print("No scores available. Run analyze() first.")
+            return ResultSet()
+        weights = self.weights if weights is None else tuple(weights)
+        threshold = self.threshold if threshold is None else threshold
+        self.detailed_results = self.flagged_in(self.pair_scores, weights, threshold)
+        return self.detailed_results
+
+    def flagged_in(self, store, weights, threshold):
+        """Returns the ResultSet of the pairs of a PairScores the weights, the threshold and the model flag."""
+        # Pairs scored without an exact Levenshtein score that could now pass are completed first
+        incomplete = np.flatnonzero(store.incomplete() & (store.overall_upper_bound(weights) > threshold))
+        if len(incomplete):
+            self.complete_pairs(store, incomplete)
+
+        overall = store.overall(weights)
+        flagged = np.flatnonzero((overall > threshold) & (store.probabilities > 0.5))
+        structure_scores = self.similarity_detector.structure_scores if self.similarity_detector is not None else {}
+        results = ResultSet()
+        for row, scores in zip(flagged, store.metrics[flagged].tolist()):
+            pair = store.pair(row)
+            results.append(PairResult(*pair, *scores, float(overall[row]), ml_prediction=1,
+                                      structure_similarity=structure_scores.get(pair)))
+        return results
+
+    def complete_pairs(self, store, rows):
+        """
+        Computes the exact Levenshtein score, the features and the probability of pairs whose
+        Levenshtein computation was cut short, and records them in the run state.
+        """
+        hashes = self.reader.hashes
+        artifacts = self.run_state.artifacts
+        for row in rows:
+            file1, file2 = store.pair(row)
+            artifacts1, artifacts2 = artifacts[hashes[file1]], artifacts[hashes[file2]]
+            text_sim_score, ast_sim_score, token_sim_score = store.metrics[row, :3].tolist()
+            lev_sim_score = self.levenshtein_similarity(artifacts1.code, artifacts2.code)
+            feature_row = self.feature_row(artifacts1, artifacts2, ast_sim_score, token_sim_score, lev_sim_score)
+            store.complete(row, lev_sim_score, feature_row)
+            self.run_state.pairs[(hashes[file1], hashes[file2])] = (
+                (text_sim_score, ast_sim_score, token_sim_score, lev_sim_score, None), feature_row)
+        store.probabilities[rows] = self.predict_proba(store.features[rows])
+        print(f"Computed the exact Levenshtein similarity of {len(rows)} more pairs")
+
+    def score_candidate(self, files, artifacts, file1, file2, cached_metrics=None):
+        """
+        Scores one candidate pair from its file contents: the text similarity, then the
+        other metrics when it clears the text threshold (see score_pair). Returns (outcome,
+        computed_metrics), outcome being None below the text threshold. Artifacts missing
+        from `artifacts` are built on the way; worker processes get them all up front.
+        """
+        cached_metrics = cached_metrics or {}
+        computed_metrics = {}
+        text_sim_score = cached_metrics.get('text')
+        if text_sim_score is None:
+            text_sim_score = computed_metrics['text'] = text_similarity(files[file1], files[file2])
+        if text_sim_score <= TEXT_THRESHOLD:
+            return None, computed_metrics
+
+        self.add_artifacts(artifacts, (file1, file2))
+        outcome, pair_metrics = self.score_pair(artifacts, file1, file2, text_sim_score, cached_metrics)
+        computed_metrics.update(pair_metrics)
+        return outcome, computed_metrics
+
+    def score_pair(self, artifacts, file1, file2, text_sim_score, cached_metrics=None):
+        """
+        Scores one candidate pair from the per-file artifacts, taking the metric values found in
+        `cached_metrics` instead of computing them. Returns (outcome, computed_metrics): outcome
+        is (metrics, feature_row), metrics being the text, AST, token and Levenshtein scores
+        and the bound the Levenshtein score lies below when it was not computed exactly, in
+        which case feature_row is None; computed_metrics holds the metric values computed here.
+        Whether the pair is flagged is decided later for all pairs at once (see rescore).
+        """
+        # Debug output
+        print(f"Comparing {file1} and {file2}")
+
+        cached_metrics = cached_metrics or {}
+        computed_metrics = {}
+        artifacts1, artifacts2 = artifacts[file1], artifacts[file2]
+
+        ast_sim_score = cached_metrics.get('ast')
+        if ast_sim_score is None:
+            ast_sim_score = computed_metrics['ast'] = self.ast_comparator.compare_function_hashes(
+                artifacts1.function_hashes, artifacts2.function_hashes)
+        token_sim_score = cached_metrics.get('token')
+        if token_sim_score is None:
+            token_sim_score = computed_metrics['token'] = self.token_similarity(artifacts1, artifacts2)
+
+        # Smallest Levenshtein similarity that can still lift the overall score above the
+        # threshold; below it the pair cannot be flagged, so the exact distance is not needed
+        text_weight, ast_weight, token_weight, lev_weight = self.weights
+        min_lev_sim = None
+        if self.prune_levenshtein and lev_weight > 0:
+            min_lev_sim = (self.threshold - text_weight * text_sim_score - ast_weight * ast_sim_score -
+                           token_weight * token_sim_score) / lev_weight - 1e-9
+        lev_sim_score = cached_metrics.get('levenshtein')
+        if lev_sim_score is None:
+            # A pruned pair only stores the bound it was pruned at; the similarity lies below it,
+            # so the pair is pruned again whenever the required similarity is at least that bound
+            lev_below = cached_metrics.get('levenshtein_below')
+            if lev_below is not None and min_lev_sim is not None and lev_below <= min_lev_sim:
+                return ((text_sim_score, ast_sim_score, token_sim_score, None, lev_below), None), computed_metrics
+            lev_sim_score = self.levenshtein_similarity(artifacts1.code, artifacts2.code,
+                                                        min_similarity=min_lev_sim)
+            if lev_sim_score is None:
+                computed_metrics['levenshtein_below'] = min_lev_sim
+                return ((text_sim_score, ast_sim_score, token_sim_score, None, min_lev_sim), None), computed_metrics
+            computed_metrics['levenshtein'] = lev_sim_score
+
+        feature_row = self.feature_row(artifacts1, artifacts2, ast_sim_score, token_sim_score, lev_sim_score)
+        return ((text_sim_score, ast_sim_score, token_sim_score, lev_sim_score, None), feature_row), computed_metrics
+
+    def feature_row(self, artifacts1, artifacts2, ast_sim_score, token_sim_score, lev_sim_score):
+        """The model's feature row of a pair, in FEATURE_COLUMNS order."""
+        # Additional features from the per-file records
+        extra_features = combine_file_features(artifacts1.features, artifacts2.features)
+        return (
+            ast_sim_score,
+            token_sim_score,
+            lev_sim_score,
+            artifacts1.length,
+            artifacts2.length,
+            extra_features['Function Count File 1'],
+            extra_features['Function Count File 2'],
+            extra_features['Variable Count File 1'],
+            extra_features['Variable Count File 2'],
+            extra_features['Comment Ratio File 1'],
+            extra_features['Comment Ratio File 2'],
+            extra_features['Cyclomatic Complexity File 1'],
+            extra_features['Cyclomatic Complexity File 2']
+        )
+
+    def token_similarity(self, artifacts1, artifacts2):
+        """Token similarity of two submissions with the configured token metric."""
+        if self.token_metric == 'gst':
+            return self.gst_tiler.similarity(artifacts1.tokens, artifacts2.tokens)[0]
+        return self.tokenizer._token_similarity(artifacts1.tokens, artifacts2.tokens)
+
+    def cache_metric_names(self):
+        """
+        Maps the names metrics are cached under to (metric, version); the cache name of the
+        token metric depends on its settings.
+        """
+        names = {metric: (metric, version) for metric, version in METRIC_VERSIONS.items()
+                 if metric not in ('token', 'gst')}
+        if self.token_metric == 'gst':
+            names[f'gst{self.gst_tiler.min_match}'] = ('token', METRIC_VERSIONS['gst'])
+        else:
+            names['token'] = ('token', METRIC_VERSIONS['token'])
+        return names
+
+    def predict_proba(self, features):
+        """
+        Scale a (pairs x features) matrix and return the cheating probability of every row in
+        one call; the model predicts cheating above 0.5.
+        """
+        if len(features) == 0:
+            return np.empty(0)
+        if self.compiled_model is not None:
+            return self.compiled_model.predict_proba(self.compiled_model.transform(features))[:, 1]
+        scaled_features = self.scaler.transform(pd.DataFrame(features, columns=FEATURE_COLUMNS))
+        return self.model.predict_proba(scaled_features)[:, 1]
+
+    def predict(self, features):
+        """
+        Scale a (pairs x features) matrix and predict cheating for every row in one call.
+        """
+        return (self.predict_proba(features) > 0.5).astype(int)
+
+    def get_cache_stats(self):
+        """
+        Return the artifact cache hits and misses of the last analyze() run, and those of the
+        pair-score cache when one is used.
+        """
+        stats = {'hits': self.artifact_cache.hits, 'misses': self.artifact_cache.misses}
+        if self.score_cache is not None:
+            stats['score_hits'] = self.score_cache.hits
+            stats['score_misses'] = self.score_cache.misses
+        return stats
+
+    def __getstate__(self):
+        # Only the scoring components are shipped to worker processes
+        state = self.__dict__.copy()
+        state['similarity_detector'] = None
+        state['model'] = None
+        state['scaler'] = None
+        state['compiled_model'] = None
+        state['artifact_cache'] = None
+        state['run_state'] = None
+        state['score_cache'] = None
+        state['pair_scores'] = None
+        state['detailed_results'] = ResultSet()
+        return state
 
     def get_cheating_report(self):
-        results = self.analyze()
+        results = self.get_results()
         if not results:
             print("No potential cheating detected.")
             return ["No potential cheating detected."]
 
-        report = []
-        for file1, file2, score, ml_prediction in results:
-            report.append(
-                f'Possible cheating between {file1} and {file2} '
-                f'with an overall score of {score:.2f} and ML prediction: {ml_prediction}')
-        return report
+        return [result.report_line() for result in results]
+
+    def get_results(self, progress=None, on_result=None, should_cancel=None):
+        """
+        Return the structured ResultSet, reusing the last analysis while the
+        folder contents are unchanged. The callbacks are passed on to analyze().
+        """
+        if self.results_fingerprint is not None and self.results_fingerprint == self.reader.fingerprint():
+            print("Folder unchanged, reusing the previous analysis.")
+            return self.detailed_results
+        return self.analyze(progress=progress, on_result=on_result, should_cancel=should_cancel)
 
     def get_detailed_results(self):
         """
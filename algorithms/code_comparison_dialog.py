@@ -1,36 +1,150 @@
-from PyQt6.QtWidgets import QDialog, QTextEdit, QVBoxLayout, QLabel
-from PyQt6.QtGui import QFont
+from itertools import accumulate
+from PyQt6.QtCore import QCoreApplication, QThread, pyqtSignal
+from PyQt6.QtWidgets import QDialog, QPlainTextEdit, QTextEdit, QVBoxLayout, QLabel, QSplitter, QWidget
+from PyQt6.QtGui import QFont, QColor, QTextCursor, QTextCharFormat
+from algorithms.winnowing import WinnowingIndex
+from algorithms.tokenizer import language_of, token_offsets
+
+# Background colors of the matched regions; a region has the same color on both sides
+MATCH_COLORS = ['#fff2a8', '#c8f0c8', '#c8e0ff', '#ffd6c8', '#e8d0ff', '#c8f4f0']
+
+
+def matched_character_ranges(code1, code2, filename1, filename2, k=5, window=4, should_cancel=None):
+    """
+    Returns the regions of two sources that share winnowed token fingerprints, as a list of
+    ((start1, end1), (start2, end2)) half-open character ranges, or None once should_cancel
+    returns true.
+    """
+    cancelled = should_cancel if should_cancel is not None else lambda: False
+    index = WinnowingIndex(k=k, window=window)
+    index.add(filename1, code1, language_of(filename1))
+    if cancelled():
+        return None
+    index.add(filename2, code2, language_of(filename2))
+    if cancelled():
+        return None
+
+    # Token positions index the raw tokens, which normalization maps one to one
+    offsets1 = token_offsets(code1, index.tokenizer.lex(code1, language_of(filename1)))
+    offsets2 = token_offsets(code2, index.tokenizer.lex(code2, language_of(filename2)))
+    regions = index.matched_regions(filename1, filename2, should_cancel=cancelled)
+    if regions is None:
+        return None
+    ranges = []
+    for (start1, end1), (start2, end2) in regions:
+        end1, end2 = min(end1, len(offsets1)), min(end2, len(offsets2))
+        if start1 < end1 and start2 < end2:
+            ranges.append(((offsets1[start1][0], offsets1[end1 - 1][1]),
+                           (offsets2[start2][0], offsets2[end2 - 1][1])))
+    return ranges
+
+
+def document_positions(code):
+    """
+    Maps character offsets of the code to positions in a Qt document, which counts UTF-16
+    units: characters beyond the Basic Multilingual Plane take two. None when they agree.
+    """
+    if all(ord(char) <= 0xFFFF for char in code):
+        return None
+    return [0] + list(accumulate(2 if ord(char) > 0xFFFF else 1 for char in code))
+
+
+class MatchThread(QThread):
+    """
+    Computes the matched regions of the two sources off the GUI thread. Interrupting it
+    stops the matching without emitting matches_ready.
+    """
+    matches_ready = pyqtSignal(object)
+
+    def __init__(self, code1, code2, filename1, filename2, k, window, parent=None):
+        super().__init__(parent)
+        self.arguments = (code1, code2, filename1, filename2, k, window)
+
+    def run(self):
+        ranges = matched_character_ranges(*self.arguments, should_cancel=self.isInterruptionRequested)
+        if ranges is not None:
+            self.matches_ready.emit(ranges)
 
 
 class CodeComparisonDialog(QDialog):
-    def __init__(self, code1, code2, filename1, filename2, parent=None):
+    def __init__(self, code1, code2, filename1, filename2, parent=None, k=5, window=4):
         super().__init__(parent)
         self.setWindowTitle("Code Comparison")
-        self.setGeometry(100, 100, 1000, 600)
+        self.setGeometry(100, 100, 1200, 700)
 
         # Layouts
         layout = QVBoxLayout(self)
+        self.status_label = QLabel("Finding matching code...")
+        layout.addWidget(self.status_label)
 
-        # Filenames Labels
-        label1 = QLabel(filename1)
-        label1.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        layout.addWidget(label1)
+        # Both files side by side; QPlainTextEdit lays out large documents lazily
+        splitter = QSplitter(self)
+        self.code1_text = self.add_code_pane(splitter, filename1, code1)
+        self.code2_text = self.add_code_pane(splitter, filename2, code2)
+        self.positions1 = document_positions(code1)
+        self.positions2 = document_positions(code2)
+        layout.addWidget(splitter)
 
-        code1_text = QTextEdit()
-        code1_text.setPlainText(code1)
-        code1_text.setFont(QFont("Courier", 10))
-        code1_text.setReadOnly(True)
-        layout.addWidget(code1_text)
+        # Set layout for the dialog
+        self.setLayout(layout)
 
-        label2 = QLabel(filename2)
-        label2.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-        layout.addWidget(label2)
+        # The matched regions are painted in once they have been computed. The thread belongs
+        # to the application, not the dialog, so closing the dialog never waits for it
+        self.match_thread = MatchThread(code1, code2, filename1, filename2, k, window,
+                                        QCoreApplication.instance())
+        self.match_thread.matches_ready.connect(self.show_matches)
+        self.match_thread.finished.connect(self.match_thread.deleteLater)
+        self.match_thread.start()
 
-        code2_text = QTextEdit()
-        code2_text.setPlainText(code2)
-        code2_text.setFont(QFont("Courier", 10))
-        code2_text.setReadOnly(True)
-        layout.addWidget(code2_text)
+    def add_code_pane(self, splitter, filename, code):
+        pane = QWidget(splitter)
+        pane_layout = QVBoxLayout(pane)
+        pane_layout.setContentsMargins(0, 0, 0, 0)
 
-        # Set layout for the dialog
-        self.setLayout(layout)
+        # Filename label
+        label = QLabel(filename)
+        label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        pane_layout.addWidget(label)
+
+        code_text = QPlainTextEdit()
+        code_text.setFont(QFont("Courier", 10))
+        code_text.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        code_text.setReadOnly(True)
+        code_text.setPlainText(code)
+        pane_layout.addWidget(code_text)
+        splitter.addWidget(pane)
+        return code_text
+
+    def show_matches(self, ranges):
+        self.match_thread = None  # Finished, and deleted once control returns to the event loop
+        selections1 = []
+        selections2 = []
+        for index, (range1, range2) in enumerate(ranges):
+            color = QColor(MATCH_COLORS[index % len(MATCH_COLORS)])
+            selections1.append(self.highlight(self.code1_text, self.positions1, range1, color))
+            selections2.append(self.highlight(self.code2_text, self.positions2, range2, color))
+        self.code1_text.setExtraSelections(selections1)
+        self.code2_text.setExtraSelections(selections2)
+        self.status_label.setText(f"{len(ranges)} matching regions" if ranges else "No matching regions found")
+
+    def highlight(self, code_text, positions, character_range, color):
+        start, end = character_range
+        if positions is not None:
+            start, end = positions[start], positions[end]
+        selection = QTextEdit.ExtraSelection()
+        cursor = QTextCursor(code_text.document())
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        selection.cursor = cursor
+        text_format = QTextCharFormat()
+        text_format.setBackground(color)
+        selection.format = text_format
+        return selection
+
+    def done(self, result):
+        # Stop a match still running without waiting for it; it deletes itself once it has stopped
+        if self.match_thread is not None:
+            self.match_thread.matches_ready.disconnect(self.show_matches)
+            self.match_thread.requestInterruption()
+            self.match_thread = None
+        super().done(result)
@@ -0,0 +1,123 @@
+import os
+import numpy as np
+
+ML_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ML')
+COMPILED_MODEL_PATH = os.path.join(ML_DIR, 'cheating_detector_model.npz')
+
+
+class CompiledModel:
+    """
+    NumPy-only evaluator for the trained scaler + XGBoost classifier.
+
+    All trees are stored as flat node arrays (feature index, threshold, left/right child,
+    default direction for missing values, leaf value); children are global node indices
+    and leaves have left == -1. predict() walks every tree for the whole batch at once,
+    reproducing xgboost's float32 arithmetic so that the predictions are identical.
+    """
+
+    def __init__(self, arrays):
+        self.mean = arrays['mean']
+        self.scale = arrays['scale']
+        self.roots = arrays['roots']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.default_left = arrays['default_left']
+
+        # Leaves point back to themselves, so a fixed number of steps reaches every leaf
+        node_ids = np.arange(len(arrays['left']), dtype=np.int32)
+        is_leaf = arrays['left'] < 0
+        self.left = np.where(is_leaf, node_ids, arrays['left'])
+        self.right = np.where(is_leaf, node_ids, arrays['right'])
+        self.value = arrays['value']
+        self.base_margin = np.float32(arrays['base_margin'])
+        self.depth = int(arrays['depth'])
+
+    @classmethod
+    def load(cls, path=COMPILED_MODEL_PATH):
+        with np.load(path) as arrays:
+            return cls({name: arrays[name] for name in arrays.files})
+
+    def transform(self, features):
+        """Standard scaling, identical to the fitted StandardScaler.transform."""
+        return (np.asarray(features, dtype=np.float64) - self.mean) / self.scale
+
+    def margin(self, scaled_features):
+        rows = np.asarray(scaled_features, dtype=np.float32)
+        row_offsets = (np.arange(len(rows)) * rows.shape[1])[:, None]
+        flat_rows = rows.ravel()
+        nodes = np.broadcast_to(self.roots, (len(rows), len(self.roots))).copy()
+
+        # One level of every tree per step
+        for _ in range(self.depth):
+            values = flat_rows[row_offsets + self.feature[nodes]]
+            go_left = values < self.threshold[nodes]
+            missing = np.isnan(values)
+            if missing.any():
+                go_left = np.where(missing, self.default_left[nodes], go_left)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        # Accumulate tree by tree in float32, in the same order as xgboost
+        leaf_values = self.value[nodes]
+        margin = np.full(len(rows), self.base_margin, dtype=np.float32)
+        for tree in range(leaf_values.shape[1]):
+            margin += leaf_values[:, tree]
+        return margin
+
+    def predict_proba(self, scaled_features):
+        margin = self.margin(scaled_features)
+        positive = np.float32(1) / (np.float32(1) + np.exp(-margin))
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, scaled_features):
+        return (self.predict_proba(scaled_features)[:, 1] > 0.5).astype(int)
+
+
+def export_model(model, scaler, path=COMPILED_MODEL_PATH):
+    """Flattens a fitted XGBClassifier (binary:logistic, gbtree) and StandardScaler into an .npz file."""
+    import json
+
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw('json'))['learner']
+    trees = learner['gradient_booster']['model']['trees']
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+
+    roots, feature, threshold, left, right, default_left, value = [], [], [], [], [], [], []
+    depth = 0
+    for tree in trees:
+        offset = len(feature)
+        roots.append(offset)
+        depths = [0] * len(tree['left_children'])
+        for node, (left_child, right_child) in enumerate(zip(tree['left_children'], tree['right_children'])):
+            leaf = left_child == -1
+            feature.append(0 if leaf else tree['split_indices'][node])
+            threshold.append(tree['split_conditions'][node])
+            left.append(-1 if leaf else left_child + offset)
+            right.append(-1 if leaf else right_child + offset)
+            default_left.append(bool(tree['default_left'][node]))
+            value.append(tree['split_conditions'][node] if leaf else 0.0)
+            if not leaf:
+                depths[left_child] = depths[right_child] = depths[node] + 1
+        depth = max(depth, max(depths))
+
+    np.savez(
+        path,
+        mean=np.asarray(scaler.mean_, dtype=np.float64),
+        scale=np.asarray(scaler.scale_, dtype=np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        feature=np.asarray(feature, dtype=np.int32),
+        threshold=np.asarray(threshold, dtype=np.float32),
+        left=np.asarray(left, dtype=np.int32),
+        right=np.asarray(right, dtype=np.int32),
+        default_left=np.asarray(default_left, dtype=bool),
+        value=np.asarray(value, dtype=np.float32),
+        base_margin=np.float32(-np.log(np.float32(1) / np.float32(base_score) - np.float32(1))),
+        depth=depth
+    )
+
+
+if __name__ == "__main__":
+    import joblib
+
+    export_model(joblib.load(os.path.join(ML_DIR, 'cheating_detector_model.pkl')),
+                 joblib.load(os.path.join(ML_DIR, 'scaler.pkl')))
+    print(f"Compiled model saved to: {COMPILED_MODEL_PATH}")
@@ -0,0 +1,133 @@
+import re
+from tokenize import NAME, NUMBER, STRING, OP, COMMENT, NEWLINE, ERRORTOKEN
+
+KEYWORDS = frozenset([
+    'alignas', 'alignof', 'and', 'and_eq', 'asm', 'auto', 'bitand', 'bitor', 'bool', 'break', 'case', 'catch',
+    'char', 'char8_t', 'char16_t', 'char32_t', 'class', 'co_await', 'co_return', 'co_yield', 'compl', 'concept',
+    'const', 'consteval', 'constexpr', 'constinit', 'const_cast', 'continue', 'decltype', 'default', 'delete',
+    'do', 'double', 'dynamic_cast', 'else', 'enum', 'explicit', 'export', 'extern', 'false', 'float', 'for',
+    'friend', 'goto', 'if', 'inline', 'int', 'long', 'mutable', 'namespace', 'new', 'noexcept', 'not', 'not_eq',
+    'nullptr', 'operator', 'or', 'or_eq', 'private', 'protected', 'public', 'register', 'reinterpret_cast',
+    'requires', 'return', 'short', 'signed', 'sizeof', 'static', 'static_assert', 'static_cast', 'struct',
+    'switch', 'template', 'this', 'thread_local', 'throw', 'true', 'try', 'typedef', 'typeid', 'typename',
+    'union', 'unsigned', 'using', 'virtual', 'void', 'volatile', 'wchar_t', 'while',
+    # Preprocessor directives
+    'include', 'define', 'undef', 'ifdef', 'ifndef', 'elif', 'endif', 'pragma', 'error', 'line'
+])
+
+_OPERATORS = [
+    '>>=', '<<=', '<=>', '->*', '...', '::', '->', '++', '--', '<<', '>>', '<=', '>=', '==', '!=', '&&', '||',
+    '+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '.*', '##',
+    '{', '}', '[', ']', '(', ')', '<', '>', ';', ':', ',', '.', '?', '!', '~', '+', '-', '*', '/', '%', '^', '&',
+    '|', '=', '#'
+]
+
+_TOKEN_PATTERN = re.compile('|'.join([
+    r'(?P<whitespace>[ \t\f\v\r]+|\\\n)',
+    r'(?P<identifier>(?!(?:u8|[uUL])?R?["\'])[A-Za-z_]\w*)',  # Unless it is a literal prefix
+    r'(?P<newline>\n)',
+    r'(?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))',
+    # Raw strings keep everything up to )delimiter"; other literals honour escapes
+    r'(?P<raw_string>(?:u8|[uUL])?R"(?P<delimiter>[^ ()\\\t\v\f\n]{0,16})\(.*?(?:\)(?P=delimiter)"|\Z))',
+    r'(?P<string>(?:u8|[uUL])?"[^"\\\n]*(?:\\.[^"\\\n]*)*"?)',
+    r"(?P<char>(?:u8|[uUL])?'[^'\\\n]*(?:\\.[^'\\\n]*)*'?)",
+    r"(?P<number>(?:0[xX][0-9a-fA-F']+|0[bB][01']+|[0-9][0-9']*\.?[0-9']*(?:[eE][+-]?[0-9]+)?"
+    r"|\.[0-9][0-9']*(?:[eE][+-]?[0-9]+)?)[A-Za-z_]*)",
+    '(?P<op>' + '|'.join(map(re.escape, _OPERATORS)) + ')',
+    r'(?P<error>.)'
+]), re.DOTALL)
+
+# Token type of every kind of match, whitespace being skipped
+_KINDS = {'identifier': NAME, 'comment': COMMENT, 'raw_string': STRING, 'string': STRING, 'char': STRING,
+          'number': NUMBER, 'op': OP, 'error': ERRORTOKEN}
+
+# Statement heads starting with these open a block, never a function body
+_CONTROL_KEYWORDS = frozenset(['if', 'else', 'for', 'while', 'do', 'switch', 'catch', 'try', 'return',
+                               'class', 'struct', 'union', 'enum', 'namespace', 'extern'])
+_ACCESS_SPECIFIERS = frozenset(['public', 'private', 'protected'])
+
+
+def generate_tokens(code):
+    """
+    Returns the (type, string) tokens of C/C++ source in one regex pass, using the same
+    token types as the Python lexer: identifiers and keywords are NAMEs, string and
+    character literals STRINGs. Whitespace is dropped except for the line break that ends
+    a preprocessor directive, which becomes a NEWLINE. Never raises: unterminated comments
+    and literals end at the end of the line or file.
+    """
+    tokens = []
+    append = tokens.append
+    in_directive = False
+    line_start = True
+
+    for match in _TOKEN_PATTERN.finditer(code):
+        kind = match.lastgroup
+        if kind == 'whitespace':
+            continue
+        if kind == 'newline':
+            if in_directive:
+                append((NEWLINE, '\n'))
+                in_directive = False
+            line_start = True
+            continue
+
+        text = match.group()
+        if line_start and text == '#':
+            in_directive = True
+        line_start = False
+        append((_KINDS[kind], text))
+
+    if in_directive:
+        append((NEWLINE, ''))
+    return tokens
+
+
+def _is_function_head(head):
+    """Whether the tokens before a '{' declare a function: a parameter list, no initializer, no control keyword."""
+    if not head or head[0] in _CONTROL_KEYWORDS or '(' not in head or ')' not in head:
+        return False
+    return '=' not in head[:head.index('(')]
+
+
+def function_spans(tokens):
+    """
+    Segments the functions of a token list by braces. Returns the (start, end) token
+    slices of every function definition, from the first token of its head (return type,
+    template header) to its closing brace. Methods defined in classes and namespaces are
+    included; lambdas and local classes are part of their enclosing function.
+    """
+    spans = []
+    stack = []  # Start index of every open function body, None for other blocks
+    head_start = 0
+    head = []  # Strings of the current statement head, without comments
+    function_depth = 0
+
+    for i, (token_type, string) in enumerate(tokens):
+        if token_type == COMMENT:
+            if not head:
+                head_start = i + 1
+            continue
+
+        # Braces, semicolons, the end of a directive and access labels end a statement head
+        ends_head = (token_type == NEWLINE or (token_type == OP and string in ('{', '}', ';')) or
+                     (string == ':' and len(head) == 1 and head[0] in _ACCESS_SPECIFIERS))
+        if not ends_head:
+            if not head:
+                head_start = i
+            head.append(string)
+            continue
+
+        if string == '{':
+            if function_depth == 0 and _is_function_head(head):
+                stack.append(head_start)
+                function_depth += 1
+            else:
+                stack.append(None)
+        elif string == '}' and stack:
+            start = stack.pop()
+            if start is not None:
+                function_depth -= 1
+                spans.append((start, i + 1))
+        head = []
+        head_start = i + 1
+    return spans
@@ -1,5 +1,9 @@
 import re
-from radon.complexity import cc_visit
+from tokenize import NAME, OP
+from radon.complexity import cc_visit, cc_visit_ast
+
+# C++ tokens that add a decision point, as radon counts branches and boolean operators for Python
+_CPP_DECISION_TOKENS = frozenset(['if', 'for', 'while', 'case', 'catch', '&&', '||', '?', 'and', 'or'])
 
 
 def count_functions_and_variables(code):
@@ -21,33 +25,71 @@ def calculate_comment_ratio(code):
     return comment_lines / total_lines
 
 
-def calculate_cyclomatic_complexity_average(code):
-    blocks = cc_visit(code)
+def calculate_cyclomatic_complexity_average(code, tree=None):
+    # Reuse an already parsed tree when the caller has one; code that does not parse has no blocks
+    try:
+        blocks = cc_visit_ast(tree) if tree is not None else cc_visit(code)
+    except (SyntaxError, ValueError):
+        return 0
     if not blocks:
         return 0
     return sum(block.complexity for block in blocks) / len(blocks)
 
 
-def extract_extra_features(code1, code2):
-    # Function count and variable count
-    function_count1, variable_count1 = count_functions_and_variables(code1)
-    function_count2, variable_count2 = count_functions_and_variables(code2)
+def extract_file_features(code, tree=None):
+    """Computes the per-file half of the extra features for a single submission."""
+    function_count, variable_count = count_functions_and_variables(code)
+    return {
+        'Function Count': function_count,
+        'Variable Count': variable_count,
+        'Comment Ratio': calculate_comment_ratio(code),
+        'Cyclomatic Complexity': calculate_cyclomatic_complexity_average(code, tree)
+    }
+
 
-    # Comment ratio
-    comment_ratio1 = calculate_comment_ratio(code1)
-    comment_ratio2 = calculate_comment_ratio(code2)
+def calculate_cpp_comment_ratio(code):
+    total_lines = len(code.splitlines())
+    comment_lines = sum(1 for line in code.splitlines() if line.strip().startswith(('//', '/*', '*')))
+
+    if total_lines == 0:
+        return 0
+    return comment_lines / total_lines
 
-    # Cyclomatic complexity
-    cyclomatic_complexity1 = calculate_cyclomatic_complexity_average(code1)
-    cyclomatic_complexity2 = calculate_cyclomatic_complexity_average(code2)
 
+def calculate_cpp_cyclomatic_complexity_average(tokens, spans):
+    # One plus the decision points of every function, averaged like radon's blocks
+    if not spans:
+        return 0
+    complexities = [1 + sum(1 for token_type, string in tokens[start:end]
+                            if token_type in (NAME, OP) and string in _CPP_DECISION_TOKENS)
+                    for start, end in spans]
+    return sum(complexities) / len(complexities)
+
+
+def extract_cpp_file_features(code, tokens, spans):
+    """C++ version of extract_file_features, from the raw tokens and the function spans."""
+    _, variable_count = count_functions_and_variables(code)
+    return {
+        'Function Count': len(spans),
+        'Variable Count': variable_count,
+        'Comment Ratio': calculate_cpp_comment_ratio(code),
+        'Cyclomatic Complexity': calculate_cpp_cyclomatic_complexity_average(tokens, spans)
+    }
+
+
+def combine_file_features(features1, features2):
+    """Assembles the pair features from two per-file feature records."""
     return {
-        'Function Count File 1': function_count1,
-        'Function Count File 2': function_count2,
-        'Variable Count File 1': variable_count1,
-        'Variable Count File 2': variable_count2,
-        'Comment Ratio File 1': comment_ratio1,
-        'Comment Ratio File 2': comment_ratio2,
-        'Cyclomatic Complexity File 1': cyclomatic_complexity1,
-        'Cyclomatic Complexity File 2': cyclomatic_complexity2
+        'Function Count File 1': features1['Function Count'],
+        'Function Count File 2': features2['Function Count'],
+        'Variable Count File 1': features1['Variable Count'],
+        'Variable Count File 2': features2['Variable Count'],
+        'Comment Ratio File 1': features1['Comment Ratio'],
+        'Comment Ratio File 2': features2['Comment Ratio'],
+        'Cyclomatic Complexity File 1': features1['Cyclomatic Complexity'],
+        'Cyclomatic Complexity File 2': features2['Cyclomatic Complexity']
     }
+
+
+def extract_extra_features(code1, code2):
+    return combine_file_features(extract_file_features(code1), extract_file_features(code2))
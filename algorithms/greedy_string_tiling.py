@@ -0,0 +1,145 @@
+_HASH_BASE = 1000003
+_HASH_MODULUS = (1 << 61) - 1
+
+
+def encode_tokens(tokens1, tokens2):
+    """Maps the tokens of two streams to integers from one shared vocabulary."""
+    vocabulary = {}
+    encoded1 = [vocabulary.setdefault(token, len(vocabulary)) for token in tokens1]
+    encoded2 = [vocabulary.setdefault(token, len(vocabulary)) for token in tokens2]
+    return encoded1, encoded2
+
+
+def _prefix_hashes(sequence):
+    # prefix[i] is the Karp-Rabin hash of sequence[:i]; any window hash follows in O(1)
+    prefix = [0] * (len(sequence) + 1)
+    value = 0
+    for i, item in enumerate(sequence):
+        value = (value * _HASH_BASE + item + 1) % _HASH_MODULUS
+        prefix[i + 1] = value
+    return prefix
+
+
+def _unmarked_runs(marked):
+    # runs[i] is the number of consecutive unmarked tokens starting at i
+    runs = [0] * (len(marked) + 1)
+    for i in range(len(marked) - 1, -1, -1):
+        runs[i] = 0 if marked[i] else runs[i + 1] + 1
+    return runs
+
+
+class GreedyStringTiler:
+    """
+    Running-Karp-Rabin Greedy String Tiling (Wise, 1993), as used by JPlag.
+
+    Finds a set of non-overlapping tiles (maximal common substrings of at least
+    `min_match` tokens) between two integer token arrays, longest first. Each scan
+    only hashes windows of `search_length` unmarked tokens, and the search length
+    shrinks from `initial_search` down to `min_match`, so the cost stays close to
+    linear instead of the cubic cost of the naive algorithm. Streams made of one short
+    sequence repeated are the exception: each window then recurs once per period, and
+    the scans become quadratic in the number of tokens.
+    """
+
+    def __init__(self, min_match=5, initial_search=20):
+        self.min_match = min_match
+        self.initial_search = max(initial_search, min_match)
+
+    def tiles(self, pattern, text):
+        """Returns the (pattern position, text position, length) of every tile."""
+        marked_pattern = bytearray(len(pattern))
+        marked_text = bytearray(len(text))
+        pattern_hashes = _prefix_hashes(pattern)
+        text_hashes = _prefix_hashes(text)
+        tiles = []
+
+        search_length = self.initial_search
+        while search_length >= self.min_match:
+            longest, matches = self._scan_pattern(pattern, text, pattern_hashes, text_hashes,
+                                                  marked_pattern, marked_text, search_length)
+            if longest > 2 * search_length:
+                # Much longer matches exist; rescan with a window that finds them directly
+                search_length = longest
+                continue
+
+            self._mark_strings(matches, marked_pattern, marked_text, tiles)
+            if search_length > 2 * self.min_match:
+                search_length //= 2
+            elif search_length > self.min_match:
+                search_length = self.min_match
+            else:
+                break
+        return tiles
+
+    def _scan_pattern(self, pattern, text, pattern_hashes, text_hashes, marked_pattern, marked_text,
+                      search_length):
+        power = pow(_HASH_BASE, search_length, _HASH_MODULUS)
+        pattern_runs = _unmarked_runs(marked_pattern)
+        text_runs = _unmarked_runs(marked_text)
+
+        # Hashes of every unmarked window of the text
+        windows = {}
+        for j in range(len(text) - search_length + 1):
+            if text_runs[j] >= search_length:
+                key = (text_hashes[j + search_length] - text_hashes[j] * power) % _HASH_MODULUS
+                windows.setdefault(key, []).append(j)
+
+        longest = 0
+        matches = []
+        # Diagonal i - j -> pattern position where the last match extended on it stopped. A hit
+        # inside that match stops at the same place, so repeated code is not compared again
+        match_ends = {}
+        for i in range(len(pattern) - search_length + 1):
+            if pattern_runs[i] < search_length:
+                continue
+            key = (pattern_hashes[i + search_length] - pattern_hashes[i] * power) % _HASH_MODULUS
+            for j in windows.get(key, ()):
+                end = match_ends.get(i - j, 0)
+                if end > i:
+                    length = end - i
+                    if length < search_length:
+                        continue  # The window runs past a difference
+                else:
+                    if pattern[i:i + search_length] != text[j:j + search_length]:
+                        continue  # Hash collision
+
+                    # Extend the match as far as both sides stay unmarked and equal
+                    length = search_length
+                    limit = min(pattern_runs[i], text_runs[j])
+                    while length < limit and pattern[i + length] == text[j + length]:
+                        length += 1
+                    match_ends[i - j] = i + length
+                if length > 2 * search_length:
+                    return length, []
+                matches.append((length, i, j))
+                longest = max(longest, length)
+        return longest, matches
+
+    def _mark_strings(self, matches, marked_pattern, marked_text, tiles):
+        # Longest matches first; a match overlapping an earlier tile is dropped. Most overlaps
+        # are the tails of longer matches, caught by their last token without scanning
+        for length, i, j in sorted(matches, key=lambda match: -match[0]):
+            if marked_pattern[i + length - 1] or marked_text[j + length - 1]:
+                continue
+            if any(marked_pattern[i:i + length]) or any(marked_text[j:j + length]):
+                continue
+            marked_pattern[i:i + length] = b'\x01' * length
+            marked_text[j:j + length] = b'\x01' * length
+            tiles.append((i, j, length))
+
+    def similarity(self, pattern, text):
+        """
+        Returns (coverage, tiles), coverage being the share of both token arrays covered by
+        tiles: 2 * covered / (len(pattern) + len(text)).
+        """
+        if not pattern and not text:
+            return 1.0, []
+        tiles = self.tiles(pattern, text)
+        covered = sum(length for _, _, length in tiles)
+        return 2 * covered / (len(pattern) + len(text)), tiles
+
+
+def gst_similarity(tokens1, tokens2, min_match=5):
+    """Greedy String Tiling coverage and tiles of two token streams of any hashable tokens."""
+    encoded1, encoded2 = encode_tokens(tokens1, tokens2)
+    return GreedyStringTiler(min_match=min_match).similarity(encoded1, encoded2)
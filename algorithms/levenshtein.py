@@ -1,3 +1,9 @@
+from collections import Counter
+
+# Bands wider than this are cheaper to evaluate bit-parallel than cell by cell
+_BANDED_MAX_DISTANCE = 12
+
+
 def levenshtein_distance(s1, s2):
     if len(s1) < len(s2):
         return levenshtein_distance(s2, s1)
@@ -18,6 +24,129 @@ def levenshtein_distance(s1, s2):
     return previous_row[-1]
 
 
-def similarity_score(s1, s2):
-    lev_distance = levenshtein_distance(s1, s2)
-    return 1 - lev_distance / max(len(s1), len(s2))
+def myers_levenshtein_distance(s1, s2, max_distance=None):
+    """
+    Bit-parallel edit distance (Myers 1999, in Hyyrö's formulation for global distance).
+
+    The DP column over the shorter string is held as vertical +1/-1 delta bit vectors in
+    Python ints, so each character of the longer string costs a handful of word-parallel
+    operations instead of a full inner loop. Returns the same value as levenshtein_distance.
+
+    With max_distance set, returns None as soon as the distance is known to exceed it: the
+    last DP row changes by at most one per remaining character of the longer string.
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    pattern_length = len(s2)
+    if pattern_length == 0:
+        return len(s1) if max_distance is None or len(s1) <= max_distance else None
+
+    # Bit i of peq[c] is set when s2[i] == c
+    peq = {}
+    for i, c in enumerate(s2):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    full = (1 << pattern_length) - 1
+    last_bit = 1 << (pattern_length - 1)
+    positive_vertical = full
+    negative_vertical = 0
+    distance = pattern_length
+    # distance + columns done can only grow, and past this the final distance exceeds max_distance
+    bound = len(s1) + max_distance if max_distance is not None else None
+
+    for column, c in enumerate(s1, start=1):
+        eq = peq.get(c, 0)
+        xv = eq | negative_vertical
+        xh = (((eq & positive_vertical) + positive_vertical) ^ positive_vertical) | eq
+        positive_horizontal = negative_vertical | (~(xh | positive_vertical) & full)
+        negative_horizontal = positive_vertical & xh
+
+        if positive_horizontal & last_bit:
+            distance += 1
+        elif negative_horizontal & last_bit:
+            distance -= 1
+        if bound is not None and distance + column > bound:
+            return None
+
+        # The top row of the global DP grows by one per column, hence the shifted-in 1
+        positive_horizontal = ((positive_horizontal << 1) | 1) & full
+        negative_horizontal = (negative_horizontal << 1) & full
+        positive_vertical = negative_horizontal | (~(xv | positive_horizontal) & full)
+        negative_vertical = positive_horizontal & xv
+
+    if max_distance is not None and distance > max_distance:
+        return None
+    return distance
+
+
+def bounded_levenshtein_distance(s1, s2, max_distance):
+    """
+    Ukkonen's banded edit distance: only the diagonals within max_distance of the main
+    one are evaluated, and the DP stops as soon as a whole band row exceeds the bound.
+    Returns the distance, or None if it is larger than max_distance.
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if len(s1) - len(s2) > max_distance:
+        return None
+
+    columns = len(s2)
+    out_of_band = max_distance + 1
+    previous_row = [j if j <= max_distance else out_of_band for j in range(columns + 1)]
+    current_row = [out_of_band] * (columns + 1)
+
+    for i, c1 in enumerate(s1, start=1):
+        low = max(1, i - max_distance)
+        high = min(columns, i + max_distance)
+        # The cell left of the band is either the first column or outside the band
+        current_row[low - 1] = i if low == 1 and i <= max_distance else out_of_band
+
+        row_minimum = left = current_row[low - 1]
+        for j in range(low, high + 1):
+            value = previous_row[j - 1] + (c1 != s2[j - 1])
+            if previous_row[j] + 1 < value:
+                value = previous_row[j] + 1
+            if left + 1 < value:
+                value = left + 1
+            current_row[j] = left = value
+            if value < row_minimum:
+                row_minimum = value
+
+        if row_minimum > max_distance:
+            return None
+        previous_row, current_row = current_row, previous_row
+
+    return previous_row[columns] if previous_row[columns] <= max_distance else None
+
+
+def bag_distance(s1, s2):
+    """Lower bound on the edit distance from the character multisets alone."""
+    counts1 = Counter(s1)
+    counts2 = Counter(s2)
+    return max(sum((counts1 - counts2).values()), sum((counts2 - counts1).values()))
+
+
+def similarity_score(s1, s2, min_similarity=None):
+    """
+    Returns 1 - distance / longest length.
+
+    With min_similarity set, returns None as soon as the similarity is known to be below
+    it: first from the length difference, then from the character counts, and only then
+    from a banded (narrow bounds) or bit-parallel DP, both of which stop early.
+    """
+    longest = max(len(s1), len(s2))
+    if min_similarity is None:
+        return 1 - myers_levenshtein_distance(s1, s2) / longest
+
+    # Largest distance that still reaches min_similarity (rounded generously)
+    max_distance = int((1 - min_similarity) * longest + 1e-9)
+    if abs(len(s1) - len(s2)) > max_distance or bag_distance(s1, s2) > max_distance:
+        return None
+
+    if max_distance <= _BANDED_MAX_DISTANCE:
+        lev_distance = bounded_levenshtein_distance(s1, s2, max_distance)
+    else:
+        lev_distance = myers_levenshtein_distance(s1, s2, max_distance)
+    if lev_distance is None or lev_distance > max_distance:
+        return None
+    return 1 - lev_distance / longest
@@ -0,0 +1,117 @@
+import csv
+import os
+import numpy as np
+from algorithms.tokenizer import EnhancedTokenizer
+
+# Labeled reference pairs shipped with the repository
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'DataSet')
+LABELS_CSV = os.path.join(DATASET_DIR, 'cheating_dataset.csv')
+
+# Recall estimates per (bands, rows, shingle_size, dataset_dir, labels_csv), computed once per process
+_RECALL_ESTIMATES = {}
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHashLSH:
+    """
+    MinHash signatures over normalized token shingles, bucketed with banded LSH.
+
+    Each file is signed once; two files become a candidate pair when any of their
+    `bands` bands (of `rows` hash values each) land in the same bucket. The
+    probability of that for Jaccard similarity s is 1 - (1 - s^rows)^bands.
+    """
+
+    def __init__(self, bands=16, rows=4, shingle_size=5, seed=1):
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.tokenizer = EnhancedTokenizer()
+        self.names = []
+        self.signatures = {}
+        self.buckets = [{} for _ in range(bands)]
+
+        # One universal hash function (a * x + b) mod p per signature row. Shingles, a and b
+        # are below 2**32, so a * x + b < 2**64 never wraps around in uint64 before the mod
+        num_perm = bands * rows
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, code, language='python'):
+        """Returns the set of 32-bit hashes of every `shingle_size` run of normalized tokens."""
+        return set(self.tokenizer.kgram_hashes(self.tokenizer.token_ids(code, language), self.shingle_size))
+
+    def signature(self, code, language='python'):
+        """Computes the MinHash signature (one uint64 per band row) for a piece of code."""
+        shingles = np.fromiter(self.shingles(code, language), dtype=np.uint64)
+        hashed = (np.outer(shingles, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return hashed.min(axis=0)
+
+    def add(self, name, code, language='python'):
+        signature = self.signature(code, language)
+        self.names.append(name)
+        self.signatures[name] = signature
+        for band in range(self.bands):
+            key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            self.buckets[band].setdefault(key, []).append(name)
+
+    def candidate_pairs(self):
+        """
+        Returns every pair that shares at least one bucket, ordered by insertion order
+        so that the output matches the ordering of the all-pairs loop.
+        """
+        order = {name: index for index, name in enumerate(self.names)}
+        pairs = set()
+        for band_buckets in self.buckets:
+            for members in band_buckets.values():
+                for i in range(len(members)):
+                    for j in range(i + 1, len(members)):
+                        pairs.add((order[members[i]], order[members[j]]))
+        return [(self.names[i], self.names[j]) for i, j in sorted(pairs)]
+
+    def estimated_jaccard(self, name1, name2):
+        return float(np.mean(self.signatures[name1] == self.signatures[name2]))
+
+    def collision_probability(self, similarity):
+        """Probability that two files with the given Jaccard similarity become a candidate pair."""
+        return 1 - (1 - similarity ** self.rows) ** self.bands
+
+    def recall_on_labeled_pairs(self, labels_csv=LABELS_CSV):
+        """
+        Fraction of the positively labeled pairs in `labels_csv` (among the indexed files)
+        that collide in at least one band. Returns None when no labeled pair is indexed.
+        """
+        candidates = set(self.candidate_pairs())
+        total = found = 0
+        with open(labels_csv, newline='') as labels:
+            for row in csv.DictReader(labels, skipinitialspace=True):
+                file1, file2 = row['File_1'].strip(), row['File_2'].strip()
+                if int(row['Label']) != 1 or file1 not in self.signatures or file2 not in self.signatures:
+                    continue
+                total += 1
+                if (file1, file2) in candidates or (file2, file1) in candidates:
+                    found += 1
+        return found / total if total else None
+
+
+def estimate_recall(bands=16, rows=4, shingle_size=5, dataset_dir=DATASET_DIR, labels_csv=LABELS_CSV):
+    """
+    Indexes the labeled DataSet corpus with the given settings and returns the LSH recall on
+    it, or None when the corpus or its labels cannot be read. Each estimate is computed
+    once per process.
+    """
+    key = (bands, rows, shingle_size, dataset_dir, labels_csv)
+    if key not in _RECALL_ESTIMATES:
+        try:
+            index = MinHashLSH(bands=bands, rows=rows, shingle_size=shingle_size)
+            for filename in sorted(os.listdir(dataset_dir)):
+                if filename.endswith('.py'):
+                    with open(os.path.join(dataset_dir, filename), 'r', encoding='utf-8') as file:
+                        index.add(filename, file.read())
+            _RECALL_ESTIMATES[key] = index.recall_on_labeled_pairs(labels_csv)
+        except (OSError, ValueError) as e:  # ValueError: undecodable file or malformed label
+            print(f"Could not estimate the LSH recall on {dataset_dir}: {e}")
+            _RECALL_ESTIMATES[key] = None
+    return _RECALL_ESTIMATES[key]
@@ -0,0 +1,41 @@
+from multiprocessing import Pool
+
+# Per-process state, set once by _init_worker
+_detector = None
+_artifacts = None
+_files = None
+
+
+def _init_worker(detector, artifacts):
+    global _detector, _artifacts, _files
+    _detector = detector
+    _artifacts = artifacts
+    _files = {filename: record.code for filename, record in artifacts.items()}
+
+
+def _score_chunk(chunk):
+    return [_detector.score_candidate(_files, _artifacts, *pair) for pair in chunk]
+
+
+def scoring_pool(detector, artifacts, workers):
+    """
+    Process pool for score_pairs_parallel, meant to serve a whole run. The detector's
+    comparators and the per-file artifacts, which hold the file contents too, are shipped
+    to each worker once through the pool initializer, so `artifacts` must cover every file
+    the run's pairs involve.
+    """
+    return Pool(processes=workers, initializer=_init_worker, initargs=(detector, artifacts))
+
+
+def score_pairs_parallel(pool, pairs, chunk_size=64):
+    """
+    Scores (file1, file2, cached_metrics) candidate pairs with `detector.score_candidate` in a
+    pool from scoring_pool, from the text similarity on, so the workers also run the text
+    prefilter. Only the pair chunks travel per task.
+    Results come back in the same order as `pairs`, whatever order the chunks finish in.
+    """
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+    scored = []
+    for chunk_results in pool.imap(_score_chunk, chunks):
+        scored.extend(chunk_results)
+    return scored
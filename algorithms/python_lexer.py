@@ -0,0 +1,180 @@
+import re
+import tokenize
+from tokenize import NAME, NUMBER, STRING, OP, COMMENT, NL, NEWLINE, INDENT, DEDENT, ENDMARKER, ERRORTOKEN
+
+# Same token grammar as the pure-Python tokenize module (Python 3.11), f-strings being single strings
+_STRING_PREFIX = r'(?:[bB][rR]?|[rR][bBfF]?|[uU]|[fF][rR]?)?'
+_DIGITS = r'[0-9](?:_?[0-9])*'
+_EXPONENT = r'[eE][-+]?' + _DIGITS
+_POINT_FLOAT = rf'(?:{_DIGITS}\.(?:{_DIGITS})?|\.{_DIGITS})(?:{_EXPONENT})?'
+_FLOAT = rf'(?:{_POINT_FLOAT}|{_DIGITS}{_EXPONENT})'
+_INT = r'(?:0[xX](?:_?[0-9a-fA-F])+|0[bB](?:_?[01])+|0[oO](?:_?[0-7])+|0(?:_?0)*|[1-9](?:_?[0-9])*)'
+_NUMBER = rf'(?:{_DIGITS}[jJ]|{_FLOAT}[jJ]|{_FLOAT}|{_INT})'
+_OPERATORS = [
+    '!=', '%', '%=', '&', '&=', '(', ')', '*', '**', '**=', '*=', '+', '+=', ',', '-', '-=', '->', '.', '...',
+    '/', '//', '//=', '/=', ':', ':=', ';', '<', '<<', '<<=', '<=', '=', '==', '>', '>=', '>>', '>>=', '@', '@=',
+    '[', ']', '^', '^=', '{', '|', '|=', '}', '~'
+]
+
+_TOKEN_PATTERN = re.compile('|'.join([
+    r'(?P<whitespace>[ \t\f]+)',
+    # Most tokens are identifiers, so they are tried first unless they are a string prefix
+    r'(?P<identifier>(?![bBrRuUfF]{1,2}[\'"])[^\W\d]\w*)',
+    r'(?P<comment>#[^\r\n]*)',
+    r'(?P<continuation>\\\r?\n)',
+    r'(?P<newline>\r?\n)',
+    rf'(?P<string>{_STRING_PREFIX}(?:'
+    r"'''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''"
+    r'|"""[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""'
+    r"|'''.*\Z|\"\"\".*\Z"  # Unterminated triple-quoted string: the rest of the file
+    r"|'[^\n'\\]*(?:\\.[^\n'\\]*)*'"
+    r'|"[^\n"\\]*(?:\\.[^\n"\\]*)*"))',
+    rf'(?P<number>{_NUMBER})',
+    r'(?P<name>\w+)',
+    '(?P<op>' + '|'.join(map(re.escape, sorted(_OPERATORS, reverse=True))) + ')',
+    r'(?P<error>.)'
+]), re.DOTALL)
+
+_TAB_SIZE = 8
+
+
+def _indentation_column(whitespace):
+    column = 0
+    for char in whitespace:
+        if char == ' ':
+            column += 1
+        elif char == '\t':
+            column = (column // _TAB_SIZE + 1) * _TAB_SIZE
+        else:  # Form feed
+            column = 0
+    return column
+
+
+# Token type of every kind that needs no further handling
+_SIMPLE_KINDS = {'identifier': NAME, 'comment': COMMENT, 'string': STRING, 'number': NUMBER, 'name': NAME,
+                 'error': ERRORTOKEN}
+
+
+def generate_tokens(code):
+    """
+    Returns the (type, string) tokens of Python source, as tokenize.generate_tokens would,
+    without positions. Broken input never raises: unterminated strings run to the end of
+    the file, unknown characters become ERRORTOKENs and inconsistent dedents or unclosed
+    brackets are tolerated.
+    """
+    tokens = []
+    append = tokens.append
+    indents = [0]
+    depth = 0
+    at_line_start = True  # At the first token of a logical line, where indentation counts
+    indentation = ''
+    comment_line = False
+    whitespace = ''
+
+    for match in _TOKEN_PATTERN.finditer(code):
+        kind = match.lastgroup
+        if kind == 'whitespace':
+            if at_line_start:
+                indentation = match.group()
+            else:
+                whitespace = match.group()
+            continue
+
+        if at_line_start:
+            if kind == 'newline':
+                # Blank or comment-only line
+                append((NL, match.group()))
+                indentation = ''
+                comment_line = False
+                continue
+            if kind == 'comment':
+                append((COMMENT, match.group()))
+                comment_line = True
+                continue
+            at_line_start = False
+            column = _indentation_column(indentation)
+            if column > indents[-1]:
+                indents.append(column)
+                append((INDENT, indentation))
+            while column < indents[-1]:
+                indents.pop()
+                append((DEDENT, ''))
+
+        if kind == 'error' and whitespace:
+            # tokenize cannot skip whitespace before an unknown character and reports it char by char
+            tokens.extend((ERRORTOKEN, char) for char in whitespace)
+        whitespace = ''
+
+        token_type = _SIMPLE_KINDS.get(kind)
+        if token_type is not None:
+            append((token_type, match.group()))
+        elif kind == 'op':
+            text = match.group()
+            if text in '([{':
+                depth += 1
+            elif text in ')]}':
+                depth = max(depth - 1, 0)
+            append((OP, text))
+        elif kind == 'newline':
+            if depth > 0:
+                append((NL, match.group()))
+            else:
+                append((NEWLINE, match.group()))
+                at_line_start = True
+                indentation = ''
+
+    # A last line without a line break still ends its statement
+    if comment_line:
+        append((NL, ''))
+    elif not at_line_start:
+        append((NEWLINE, ''))
+    tokens.extend((DEDENT, '') for _ in indents[1:])
+    append((ENDMARKER, ''))
+    return tokens
+
+
+def compare_with_tokenize(paths):
+    """Returns the paths whose tokens differ from tokenize.generate_tokens (ignoring files it rejects)."""
+    from io import StringIO
+
+    different = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            code = file.read()
+        try:
+            expected = [(token.type, token.string) for token in tokenize.generate_tokens(StringIO(code).readline)]
+        except (tokenize.TokenError, IndentationError, SyntaxError):
+            continue
+        if generate_tokens(code) != expected:
+            different.append(path)
+    return different
+
+
+if __name__ == "__main__":
+    # Equivalence and speed check against the standard tokenizer: python -m algorithms.python_lexer DataSet homeworks
+    import os
+    import sys
+    import time
+    from io import StringIO
+
+    paths = [os.path.join(folder, filename) for folder in sys.argv[1:] or ['DataSet', 'homeworks']
+             for filename in sorted(os.listdir(folder)) if filename.endswith('.py')]
+    different = compare_with_tokenize(paths)
+    for path in different:
+        print(f"Tokens differ: {path}")
+    print(f"{len(paths) - len(different)} of {len(paths)} files tokenize identically")
+
+    sources = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            sources.append(file.read())
+    start = time.perf_counter()
+    for code in sources:
+        for _ in tokenize.generate_tokens(StringIO(code).readline):
+            pass
+    tokenize_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for code in sources:
+        generate_tokens(code)
+    lexer_time = time.perf_counter() - start
+    print(f"tokenize: {tokenize_time:.3f}s, lexer: {lexer_time:.3f}s ({tokenize_time / lexer_time:.1f}x faster)")
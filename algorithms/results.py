@@ -0,0 +1,144 @@
+import numpy as np
+
+# Metric columns of PairScores, in the order the score weights apply to them
+SCORE_METRICS = ('text', 'ast', 'token', 'levenshtein')
+
+
+class PairResult:
+    """
+    Scores of one flagged pair of submissions.
+
+    Unpacks like the old (file1, file2, overall_score, ml_prediction) tuples, so existing
+    `for file1, file2, score, ml_prediction in results` loops keep working.
+    structure_similarity is the shared-structure score of the subtree index, None in the
+    other candidate modes; it is shown, not part of the overall score.
+    """
+
+    __slots__ = ('file1', 'file2', 'text_similarity', 'ast_similarity', 'token_similarity',
+                 'levenshtein_similarity', 'overall_score', 'ml_prediction', 'structure_similarity')
+
+    def __init__(self, file1, file2, text_similarity, ast_similarity, token_similarity,
+                 levenshtein_similarity, overall_score, ml_prediction=None, structure_similarity=None):
+        self.file1 = file1
+        self.file2 = file2
+        self.text_similarity = text_similarity
+        self.ast_similarity = ast_similarity
+        self.token_similarity = token_similarity
+        self.levenshtein_similarity = levenshtein_similarity
+        self.overall_score = overall_score
+        self.ml_prediction = ml_prediction
+        self.structure_similarity = structure_similarity
+
+    def __iter__(self):
+        return iter((self.file1, self.file2, self.overall_score, self.ml_prediction))
+
+    def __repr__(self):
+        return (f'PairResult({self.file1!r}, {self.file2!r}, overall_score={self.overall_score:.4f}, '
+                f'ml_prediction={self.ml_prediction})')
+
+    def report_line(self):
+        return (f'Possible cheating between {self.file1} and {self.file2} '
+                f'with an overall score of {self.overall_score:.2f} and ML prediction: {self.ml_prediction}')
+
+
+class ResultSet:
+    """
+    Ordered collection of PairResult objects with a per-file index, so the pairs of one
+    student are found without scanning every result.
+    """
+
+    def __init__(self, results=()):
+        self.results = []
+        self.by_file = {}
+        for result in results:
+            self.append(result)
+
+    def append(self, result):
+        index = len(self.results)
+        self.results.append(result)
+        self.by_file.setdefault(result.file1, []).append(index)
+        self.by_file.setdefault(result.file2, []).append(index)
+
+    def for_file(self, filename):
+        """Returns the flagged pairs that involve the given file."""
+        return [self.results[index] for index in self.by_file.get(filename, ())]
+
+    def max_score(self, filename):
+        """Returns the highest overall score of any flagged pair involving the file, or 0."""
+        return max((result.overall_score for result in self.for_file(filename)), default=0)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+
+class PairScores:
+    """
+    Columnar store of every pair scored in a run (those that cleared the text threshold):
+    the metric scores in SCORE_METRICS order, the model's feature rows and its cheating
+    probabilities, as NumPy arrays, so other weights and thresholds can be applied to all
+    pairs at once. Files are stored as indices into `names`.
+
+    When a pair's Levenshtein computation was cut short, its Levenshtein score, features
+    and probability are NaN, and `levenshtein_below` holds the bound the score lies below.
+    """
+
+    def __init__(self, pairs, outcomes, feature_count):
+        self.names = []
+        codes = {}
+        self.files = np.empty((len(pairs), 2), dtype=np.int32)
+        self.metrics = np.full((len(pairs), len(SCORE_METRICS)), np.nan)
+        self.levenshtein_below = np.full(len(pairs), np.nan)
+        self.features = np.full((len(pairs), feature_count), np.nan)
+        self.probabilities = np.full(len(pairs), np.nan)
+
+        for row, ((file1, file2), (metrics, feature_row)) in enumerate(zip(pairs, outcomes)):
+            for column, filename in enumerate((file1, file2)):
+                code = codes.get(filename)
+                if code is None:
+                    code = codes[filename] = len(self.names)
+                    self.names.append(filename)
+                self.files[row, column] = code
+            text_sim, ast_sim, token_sim, lev_sim, lev_below = metrics
+            self.metrics[row, :3] = (text_sim, ast_sim, token_sim)
+            if lev_sim is None:
+                self.levenshtein_below[row] = lev_below
+            else:
+                self.metrics[row, 3] = lev_sim
+                self.features[row] = feature_row
+
+    def __len__(self):
+        return len(self.metrics)
+
+    def pair(self, row):
+        file1, file2 = self.files[row]
+        return self.names[file1], self.names[file2]
+
+    def incomplete(self):
+        """Boolean mask of the pairs without a Levenshtein score."""
+        return np.isnan(self.metrics[:, 3])
+
+    def overall(self, weights):
+        """
+        Overall score of every pair, summed in the same order as a single pair's score so the
+        values match it exactly; NaN for incomplete pairs.
+        """
+        return (weights[0] * self.metrics[:, 0] + weights[1] * self.metrics[:, 1] +
+                weights[2] * self.metrics[:, 2] + weights[3] * self.metrics[:, 3])
+
+    def overall_upper_bound(self, weights):
+        """Overall score of every pair, with the bound in place of a missing Levenshtein score."""
+        levenshtein = np.where(self.incomplete(), self.levenshtein_below, self.metrics[:, 3])
+        return (weights[0] * self.metrics[:, 0] + weights[1] * self.metrics[:, 1] +
+                weights[2] * self.metrics[:, 2] + weights[3] * levenshtein)
+
+    def complete(self, row, lev_sim, feature_row):
+        """Fills in the Levenshtein score and the features of an incomplete pair."""
+        self.metrics[row, 3] = lev_sim
+        self.levenshtein_below[row] = np.nan
+        self.features[row] = feature_row
@@ -0,0 +1,203 @@
+from bisect import bisect_left
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from algorithms.results import PairResult
+
+# Header and PairResult attribute of every column; the score columns follow the two file columns
+# Structure is only known in the subtree candidate mode and is stored as NaN otherwise
+COLUMNS = [
+    ('File 1', 'file1'),
+    ('File 2', 'file2'),
+    ('Text', 'text_similarity'),
+    ('AST', 'ast_similarity'),
+    ('Token', 'token_similarity'),
+    ('Levenshtein', 'levenshtein_similarity'),
+    ('Overall', 'overall_score'),
+    ('Structure', 'structure_similarity')
+]
+SCORE_COLUMNS = [attribute for _, attribute in COLUMNS[2:]]
+OVERALL = SCORE_COLUMNS.index('overall_score')
+STRUCTURE_COLUMN = len(COLUMNS) - 1
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """
+    Table of flagged pairs stored column by column: the two files as indices into the list
+    of file names and the scores in one float array. Cells are only formatted when the
+    view asks for them, i.e. for the visible rows, so the table stays fast for tens of
+    thousands of pairs. The rows shown are a sorted and filtered view of row indices.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.names = []  # File names, indexed by the file columns
+        self.name_codes = {}
+        self.files = np.empty((0, 2), dtype=np.int32)
+        self.scores = np.empty((0, len(SCORE_COLUMNS)))
+        self.count = 0  # Rows in use; the arrays grow by doubling while results stream in
+        self.rows_by_name = {}  # File name code -> rows of the pairs it takes part in
+        self.view = np.empty(0, dtype=np.int64)  # Rows shown, in display order
+        self.sort_column = None
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        self.min_score = 0.0
+        self.student = ''
+        self._sorted_names = None  # Names in sorted order, for prefix search and name sorting
+        self._overall_order = None  # Rows by increasing overall score, for the score filter
+
+    # Filling
+
+    def set_results(self, results):
+        """Replaces the rows with those of a ResultSet, keeping the sort and the filter."""
+        self.beginResetModel()
+        self.names = []
+        self.name_codes = {}
+        self.rows_by_name = {}
+        self._sorted_names = None
+        self.files = np.empty((len(results), 2), dtype=np.int32)
+        self.scores = np.empty((len(results), len(SCORE_COLUMNS)))
+        self.count = 0
+        for result in results:
+            self._store(result)
+        self._invalidate()
+        self.view = self._filtered_rows()
+        self.endResetModel()
+
+    def append_result(self, result):
+        """Adds one streamed result; it is shown at the end if it passes the filter, until the next sort."""
+        row = self._store(result)
+        self._invalidate()
+        if self._passes_filter(row):
+            position = len(self.view)
+            self.beginInsertRows(QModelIndex(), position, position)
+            self.view = np.append(self.view, row)
+            self.endInsertRows()
+
+    def clear(self):
+        self.set_results(())
+
+    def _store(self, result):
+        if self.count == len(self.files):
+            capacity = max(2 * self.count, 64)
+            self.files = np.resize(self.files, (capacity, 2))
+            self.scores = np.resize(self.scores, (capacity, len(SCORE_COLUMNS)))
+        row = self.count
+        self.count += 1
+        self.files[row] = (self._code(result.file1, row), self._code(result.file2, row))
+        self.scores[row] = [np.nan if getattr(result, attribute) is None else getattr(result, attribute)
+                            for attribute in SCORE_COLUMNS]
+        return row
+
+    def _code(self, name, row):
+        code = self.name_codes.get(name)
+        if code is None:
+            code = self.name_codes[name] = len(self.names)
+            self.names.append(name)
+            self._sorted_names = None
+        self.rows_by_name.setdefault(code, []).append(row)
+        return code
+
+    def _invalidate(self):
+        self._overall_order = None
+
+    def result(self, row):
+        """The PairResult shown in a view row, rebuilt from the columns."""
+        index = self.view[row]
+        file1, file2 = self.files[index]
+        *scores, structure = self.scores[index].tolist()
+        return PairResult(self.names[file1], self.names[file2], *scores, ml_prediction=1,
+                          structure_similarity=None if np.isnan(structure) else structure)
+
+    def column_empty(self, column):
+        """Whether no stored row has a value in a score column, e.g. Structure outside the subtree mode."""
+        return bool(np.isnan(self.scores[:self.count, column - 2]).all())
+
+    # Sorting and filtering
+
+    def set_filter(self, min_score=0.0, student=''):
+        """Shows the pairs with an overall score of at least min_score involving a file whose name starts with student."""
+        self.min_score = min_score
+        self.student = student
+        self.beginResetModel()
+        self.view = self._filtered_rows()
+        self.endResetModel()
+
+    def _sorted_name_list(self):
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self.names)
+        return self._sorted_names
+
+    def _student_rows(self):
+        # Binary search of the names starting with the prefix, then their indexed rows
+        sorted_names = self._sorted_name_list()
+        rows = []
+        for name in sorted_names[bisect_left(sorted_names, self.student):]:
+            if not name.startswith(self.student):
+                break
+            rows.extend(self.rows_by_name[self.name_codes[name]])
+        return np.unique(np.array(rows, dtype=np.int64))
+
+    def _filtered_rows(self):
+        overall = self.scores[:self.count, OVERALL]
+        if self.student:
+            rows = self._student_rows()
+            rows = rows[overall[rows] >= self.min_score]
+        else:
+            # Binary search of the score cut in the rows ordered by overall score
+            if self._overall_order is None:
+                self._overall_order = np.argsort(overall, kind='stable')
+            cut = np.searchsorted(overall[self._overall_order], self.min_score, side='left')
+            rows = np.sort(self._overall_order[cut:])
+        return self._sorted_rows(rows)
+
+    def _passes_filter(self, row):
+        if self.scores[row, OVERALL] < self.min_score:
+            return False
+        return not self.student or any(self.names[code].startswith(self.student) for code in self.files[row])
+
+    def _sorted_rows(self, rows):
+        if self.sort_column is None:
+            return rows
+        if self.sort_column < 2:
+            # File names sort by their rank among all names
+            ranks = np.empty(len(self.names), dtype=np.int64)
+            ranks[[self.name_codes[name] for name in self._sorted_name_list()]] = np.arange(len(self.names))
+            keys = ranks[self.files[rows, self.sort_column]]
+        else:
+            keys = self.scores[rows, self.sort_column - 2]
+        if self.sort_order == Qt.SortOrder.DescendingOrder:
+            keys = -keys
+        return rows[np.argsort(keys, kind='stable')]
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        self.view = self._sorted_rows(self.view)
+        self.layoutChanged.emit()
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.view)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.view[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column < 2:
+                return self.names[self.files[row, column]]
+            score = self.scores[row, column - 2]
+            return "" if np.isnan(score) else f"{score:.2f}"
+        if role == Qt.ItemDataRole.TextAlignmentRole and column >= 2:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
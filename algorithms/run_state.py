@@ -0,0 +1,56 @@
+import os
+import pickle
+from algorithms.tokenizer import TokenVocabulary
+
+# Bump whenever a change to the metrics or the pair scoring invalidates stored outcomes
+STATE_VERSION = 4
+
+
+class RunState:
+    """
+    What previous runs on a folder computed, keyed by content hash so renamed or
+    unchanged submissions are recognized: the per-file artifacts, and for every
+    candidate pair already seen its outcome (None when it was below the text
+    threshold, otherwise the metric scores and the feature row; see
+    CheatingDetector.score_pair).
+    """
+
+    def __init__(self):
+        self.version = STATE_VERSION
+        self.artifacts = {}
+        self.pairs = {}
+        self.settings = None
+        self.vocabulary = TokenVocabulary()  # The stored token id arrays are only meaningful with it
+
+    @classmethod
+    def load(cls, path):
+        """Loads the state saved at path, or returns an empty one if it is missing, unreadable or outdated."""
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as state_file:
+                    state = pickle.load(state_file)
+                if isinstance(state, cls) and state.version == STATE_VERSION:
+                    return state
+                print(f"Ignoring outdated run state: {path}")
+            except Exception as e:
+                print(f"Could not load run state {path}: {e}")
+        return cls()
+
+    def use_settings(self, settings):
+        """Forgets the pair outcomes if they were computed with different scoring settings."""
+        if self.settings != settings:
+            self.pairs = {}
+            self.settings = settings
+
+    def prune(self, live_hashes):
+        """Forgets everything about contents that are no longer in the folder."""
+        self.artifacts = {key: record for key, record in self.artifacts.items() if key in live_hashes}
+        self.pairs = {key: outcome for key, outcome in self.pairs.items()
+                      if key[0] in live_hashes and key[1] in live_hashes}
+
+    def save(self, path):
+        # Write to a temporary file first so an interrupted save never leaves a broken state behind
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'wb') as state_file:
+            pickle.dump(self, state_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
@@ -0,0 +1,106 @@
+import sqlite3
+import time
+
+# Bump a metric's version whenever its implementation changes, so older cached values are not used
+METRIC_VERSIONS = {
+    'text': 1,
+    'ast': 1,
+    'token': 1,
+    'gst': 1,  # Cached per minimum match length, e.g. as 'gst5'
+    'levenshtein': 1,
+    'levenshtein_below': 1  # Bound under which the Levenshtein similarity is known to lie
+}
+
+
+class PairScoreCache:
+    """
+    On-disk cache of per-pair metric values, keyed by (hash1, hash2, metric, version).
+
+    Values only depend on the two file contents and the metric implementation, so they
+    survive across runs, folders and threshold changes. Reads and writes are buffered
+    and applied by flush(), which also evicts the least recently used entries once the
+    cache holds more than max_entries values.
+
+    The database is opened on first use and closed by close(), so a cache created on one
+    thread can serve runs on another (SQLite connections belong to the thread that opened
+    them); it reopens on the next use.
+    """
+
+    def __init__(self, path, max_entries=1000000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._touched = {}
+        self._pending = {}
+        self.connection = None
+
+    def connect(self):
+        """Returns the connection, opening the database in the calling thread if it is closed."""
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS scores ('
+                'hash1 TEXT NOT NULL, hash2 TEXT NOT NULL, metric TEXT NOT NULL, version INTEGER NOT NULL, '
+                'value REAL, last_used INTEGER NOT NULL, PRIMARY KEY (hash1, hash2, metric, version))'
+            )
+            self.connection.execute('CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)')
+            self.connection.commit()
+        return self.connection
+
+    def lookup(self, hash1, hash2, versions):
+        """Returns {metric: value} of the cached metrics of a pair whose version matches `versions`."""
+        rows = self.connect().execute(
+            'SELECT metric, version, value FROM scores WHERE hash1 = ? AND hash2 = ?', (hash1, hash2))
+        values = {}
+        for metric, version, value in rows:
+            if versions.get(metric) == version:
+                values[metric] = value
+                self._touched[(hash1, hash2, metric, version)] = time.time_ns()
+        for metric, version in versions.items():
+            pending = self._pending.get((hash1, hash2, metric, version))
+            if pending is not None:
+                values[metric] = pending
+        self.hits += len(values)
+        return values
+
+    def put(self, hash1, hash2, metric, version, value):
+        """
+        Stores a value that had to be computed, which counts as a miss: metrics a pair never
+        needs, e.g. the Levenshtein bound of an exact pair, are neither hits nor misses.
+        """
+        self.misses += 1
+        self._pending[(hash1, hash2, metric, version)] = value
+
+    def flush(self):
+        if not self._touched and not self._pending:
+            return
+        now = time.time_ns()
+        connection = self.connect()
+        with connection:
+            connection.executemany(
+                'UPDATE scores SET last_used = ? WHERE hash1 = ? AND hash2 = ? AND metric = ? AND version = ?',
+                [(last_used,) + key for key, last_used in self._touched.items()])
+            connection.executemany(
+                'INSERT OR REPLACE INTO scores (hash1, hash2, metric, version, value, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [key + (value, now) for key, value in self._pending.items()])
+
+            # Least recently used eviction down to max_entries
+            (count,) = connection.execute('SELECT COUNT(*) FROM scores').fetchone()
+            if count > self.max_entries:
+                connection.execute(
+                    'DELETE FROM scores WHERE rowid IN (SELECT rowid FROM scores ORDER BY last_used LIMIT ?)',
+                    (count - self.max_entries,))
+        self._touched = {}
+        self._pending = {}
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self.flush()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
@@ -1,19 +1,101 @@
 from difflib import SequenceMatcher
+from algorithms.minhash_lsh import MinHashLSH, estimate_recall
+from algorithms.winnowing import WinnowingIndex
+from algorithms.subtree_index import SubtreeIndex
+from algorithms.tokenizer import language_of
+
+TEXT_THRESHOLD = 0.5  # Text similarity a pair must exceed to be compared further (probable cheating)
+
+
+def text_similarity(code1, code2):
+    return SequenceMatcher(None, code1, code2).ratio()
 
 
 class SimilarityDetector:
-    def __init__(self, files):
-        self.files = files
+    def __init__(self, files=None, mode='all', lsh_bands=16, lsh_rows=4, winnowing_k=5, winnowing_window=4,
+                 winnowing_max_postings=10, subtree_min_size=5, subtree_max_postings=10):
+        """
+        mode selects how candidate pairs are generated:
+        'all' compares every pair, 'lsh' only compares pairs that collide in MinHash LSH buckets,
+        'winnowing' only compares pairs that share a winnowed fingerprint, 'subtree' only compares
+        pairs that share a normalized AST subtree.
+        Files can be given up front or streamed in with add_file().
+        """
+        self.files = {}
+        self.mode = mode
+        self.lsh_bands = lsh_bands
+        self.lsh_rows = lsh_rows
+        self.estimated_recall = None
+        self.lsh_index = None
+        self.fingerprint_index = None
+        self.subtree_index = None
+        self.structure_scores = {}
+
+        if mode == 'lsh':
+            self.lsh_index = MinHashLSH(bands=lsh_bands, rows=lsh_rows)
+        elif mode == 'winnowing':
+            self.fingerprint_index = WinnowingIndex(k=winnowing_k, window=winnowing_window,
+                                                    max_postings=winnowing_max_postings)
+        elif mode == 'subtree':
+            self.subtree_index = SubtreeIndex(min_size=subtree_min_size, max_postings=subtree_max_postings)
+        elif mode != 'all':
+            raise ValueError(f"Unknown candidate mode: {mode}")
+
+        for filename, code in (files or {}).items():
+            self.add_file(filename, code)
+
+    def add_file(self, filename, code):
+        """Adds one file, fingerprinting it right away in the indexed modes."""
+        self.files[filename] = code
+        if self.lsh_index is not None:
+            self.lsh_index.add(filename, code, language_of(filename))
+        elif self.fingerprint_index is not None:
+            self.fingerprint_index.add(filename, code, language_of(filename))
+        elif self.subtree_index is not None:
+            self.subtree_index.add(filename, code, language_of(filename))
+
+    def set_order(self, filenames):
+        """Fixes the file order used for the pairs, independent of the order the files arrived in."""
+        self.files = {filename: self.files[filename] for filename in filenames}
 
     def calculate_similarity(self, code1, code2):
-        return SequenceMatcher(None, code1, code2).ratio()
+        return text_similarity(code1, code2)
 
-    def detect_similarities(self):
-        similarities = []
+    def _ordered(self, pairs):
+        # Orient and sort the pairs by file order, as the all-pairs loop does
+        order = {filename: index for index, filename in enumerate(self.files)}
+        oriented = [(file1, file2) if order[file1] < order[file2] else (file2, file1) for file1, file2 in pairs]
+        return sorted(oriented, key=lambda pair: (order[pair[0]], order[pair[1]]))
+
+    def candidate_pairs(self):
         filenames = list(self.files.keys())
-        for i in range(len(filenames)):
-            for j in range(i + 1, len(filenames)):
-                sim_score = self.calculate_similarity(self.files[filenames[i]], self.files[filenames[j]])
-                if sim_score > 0.5:  # Threshold for probable cheating
-                    similarities.append((filenames[i], filenames[j], sim_score))
+        total_pairs = len(filenames) * (len(filenames) - 1) // 2
+        if self.lsh_index is not None:
+            pairs = self._ordered(self.lsh_index.candidate_pairs())
+
+            self.estimated_recall = estimate_recall(bands=self.lsh_bands, rows=self.lsh_rows)
+            recall = ("" if self.estimated_recall is None else
+                      f" (estimated recall on labeled pairs: {self.estimated_recall:.2%})")
+            print(f"LSH produced {len(pairs)} candidate pairs out of {total_pairs}{recall}")
+            return pairs
+        if self.fingerprint_index is not None:
+            pairs = self._ordered(self.fingerprint_index.shared_fingerprint_counts())
+            print(f"Winnowing found {len(pairs)} pairs sharing fingerprints out of {total_pairs}")
+            return pairs
+        if self.subtree_index is not None:
+            scores = self.subtree_index.shared_structure_scores()
+            pairs = self._ordered(scores)
+            self.structure_scores = {pair: scores.get(pair, scores.get(pair[::-1])) for pair in pairs}
+            print(f"Subtree index found {len(pairs)} pairs sharing structure out of {total_pairs}")
+            return pairs
+        return [(filenames[i], filenames[j])
+                for i in range(len(filenames)) for j in range(i + 1, len(filenames))]
+
+    def detect_similarities(self, pairs=None):
+        """Returns (file1, file2, score) for the given pairs (all candidate pairs by default) above TEXT_THRESHOLD."""
+        similarities = []
+        for file1, file2 in (self.candidate_pairs() if pairs is None else pairs):
+            sim_score = self.calculate_similarity(self.files[file1], self.files[file2])
+            if sim_score > TEXT_THRESHOLD:  # Threshold for probable cheating
+                similarities.append((file1, file2, sim_score))
         return similarities
@@ -0,0 +1,228 @@
+import math
+import numpy as np
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QPainter, qRgb
+from PyQt6.QtWidgets import QWidget, QToolTip
+
+# White for unrelated submissions, through yellow to red for identical ones
+COLOR_TABLE = [qRgb(255, 255, 255 - 2 * level) if level < 128 else qRgb(255, 255 - 2 * (level - 128), 0)
+               for level in range(256)]
+
+
+def cluster_order(size, rows, columns, similarities):
+    """
+    Orders `size` items by single-linkage hierarchical clustering of the given pair
+    similarities (pairs not listed count as 0). Kruskal's algorithm merges the most similar
+    pairs first and the leaves of the resulting dendrogram give the order, so every cluster
+    is a contiguous block. Only the listed pairs are visited, never an n x n distance matrix.
+    Clusters come in the order of their strongest pair, unpaired items last.
+    """
+    parent = list(range(size))
+    node = list(range(size))  # Dendrogram node of each union-find root
+    first_merge = [None] * size  # Index of the strongest merge in each root's cluster
+    children = []  # (left, right) of every merge node, numbered from size on
+
+    def find(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for edge in np.argsort(-np.asarray(similarities, dtype=np.float64), kind='stable').tolist():
+        root1, root2 = find(int(rows[edge])), find(int(columns[edge]))
+        if root1 == root2:
+            continue
+        children.append((node[root1], node[root2]))
+        parent[root2] = root1
+        node[root1] = size + len(children) - 1
+        merges = [first_merge[root1], first_merge[root2], len(children) - 1]
+        first_merge[root1] = min(merge for merge in merges if merge is not None)
+
+    roots = [item for item in range(size) if find(item) == item]
+    roots.sort(key=lambda root: (first_merge[root] is None, first_merge[root] or 0, root))
+
+    # Leaves of each dendrogram from left to right, with an explicit stack
+    order = []
+    stack = [node[root] for root in reversed(roots)]
+    while stack:
+        current = stack.pop()
+        if current < size:
+            order.append(current)
+        else:
+            left, right = children[current - size]
+            stack.append(right)
+            stack.append(left)
+    return np.array(order, dtype=np.int64)
+
+
+def similarity_matrix(names, pair_scores, weights):
+    """
+    Builds the n x n float16 matrix of the overall scores of every scored pair of a
+    PairScores store, in cluster order. Pairs never scored count as 0, and pairs whose
+    Levenshtein score was not computed count with 0 for it. Returns (ordered names, matrix).
+    """
+    index = {name: position for position, name in enumerate(names)}
+    codes = np.array([index[name] for name in pair_scores.names], dtype=np.int64)
+    files = codes[pair_scores.files] if len(pair_scores) else np.empty((0, 2), dtype=np.int64)
+    metrics = np.nan_to_num(pair_scores.metrics, nan=0.0)
+    scores = (weights[0] * metrics[:, 0] + weights[1] * metrics[:, 1] +
+              weights[2] * metrics[:, 2] + weights[3] * metrics[:, 3])
+
+    order = cluster_order(len(names), files[:, 0], files[:, 1], scores)
+    positions = np.empty(len(names), dtype=np.int64)
+    positions[order] = np.arange(len(names))
+
+    matrix = np.zeros((len(names), len(names)), dtype=np.float16)
+    rows, columns = positions[files[:, 0]], positions[files[:, 1]]
+    matrix[rows, columns] = scores
+    matrix[columns, rows] = scores
+    np.fill_diagonal(matrix, 1.0)
+    return [names[item] for item in order], matrix
+
+
+class HeatmapWidget(QWidget):
+    """
+    Draws a similarity matrix as an image. Each paint turns only the visible cells into a
+    QImage of the widget's pixels straight from the NumPy buffer; when zoomed out, each
+    pixel shows the highest score of the cells it covers, so no similar pair disappears. The wheel zooms around the
+    cursor, dragging pans, and hovering shows the pair under the cursor.
+    """
+    hovered = pyqtSignal(str)
+
+    MAX_CELL_SIZE = 32  # Pixels per cell at the highest zoom
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setMinimumSize(200, 200)
+        self.names = []
+        self.matrix = None
+        self.levels = None  # Matrix as color table indices
+        self.pooled_levels = {}  # Block size -> levels max-pooled over blocks of that many cells
+        self.scale = 1.0  # Pixels per cell
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.drag_start = None
+
+    def set_matrix(self, names, matrix):
+        self.names = names
+        self.matrix = matrix
+        self.levels = np.rint(np.clip(matrix.astype(np.float32), 0, 1) * 255).astype(np.uint8)
+        self.pooled_levels = {}
+        self.fit()
+
+    def fit(self):
+        """Zooms out to show the whole matrix."""
+        if self.matrix is not None and len(self.matrix):
+            self.scale = min(self.width(), self.height()) / len(self.matrix)
+        self.offset_x = self.offset_y = 0.0
+        self.update()
+
+    def cell_at(self, x, y):
+        if self.matrix is None:
+            return None
+        row = math.floor((y - self.offset_y) / self.scale)
+        column = math.floor((x - self.offset_x) / self.scale)
+        if 0 <= row < len(self.matrix) and 0 <= column < len(self.matrix):
+            return row, column
+        return None
+
+    def pixel_cells(self, offset, pixels):
+        """
+        First visible pixel along an axis and, for each visible pixel from there on, the
+        half-open range of cells it overlaps.
+        """
+        size = len(self.levels)
+        edges = (np.arange(pixels + 1) - offset) / self.scale
+        starts = np.clip(np.floor(edges[:-1]).astype(np.int64), 0, size)
+        ends = np.clip(np.ceil(edges[1:] - 1e-9).astype(np.int64), 0, size)
+        visible = np.flatnonzero(ends > starts)
+        if not len(visible):
+            return 0, starts[:0], ends[:0]
+        return visible[0], starts[visible], ends[visible]
+
+    def pooled(self, block):
+        """Levels max-pooled over blocks of block x block cells, computed once per block size."""
+        if block == 1:
+            return self.levels
+        pooled = self.pooled_levels.get(block)
+        if pooled is None:
+            starts = np.arange(0, len(self.levels), block)
+            pooled = np.maximum.reduceat(np.maximum.reduceat(self.levels, starts, axis=0), starts, axis=1)
+            self.pooled_levels[block] = pooled
+        return pooled
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.GlobalColor.lightGray)
+        if self.levels is None or not len(self.levels):
+            return
+        top, row_starts, row_ends = self.pixel_cells(self.offset_y, self.height())
+        left, column_starts, column_ends = self.pixel_cells(self.offset_x, self.width())
+        if not len(row_starts) or not len(column_starts):
+            return
+
+        # Every pixel shows the highest level of the cells it overlaps, so no similar pair
+        # disappears when zoomed out. A pixel covers at least `block` cells, so it is the
+        # maximum over the pooled blocks from its first block to its last one: a reduceat
+        # over the blocks starting in it, plus the block its last cell lies in. Zoomed in, a
+        # pixel overlaps at most two cells, its first and its last
+        block = max(math.floor(1 / self.scale + 1e-9), 1)
+        region = self.pooled(block)
+        for axis, starts, ends in ((0, row_starts, row_ends), (1, column_starts, column_ends)):
+            starts, ends = starts // block, (ends - 1) // block
+            region = region[starts[0]:ends[-1] + 1] if axis == 0 else region[:, starts[0]:ends[-1] + 1]
+            if self.scale < 1:
+                pooled = np.maximum.reduceat(region, starts - starts[0], axis=axis)
+            else:
+                pooled = np.take(region, starts - starts[0], axis=axis)
+            region = np.maximum(pooled, np.take(region, ends - starts[0], axis=axis))
+
+        # Rows of a QImage buffer are 32-bit aligned; the image is drawn unscaled
+        height, width = region.shape
+        buffer = np.zeros((height, (width + 3) // 4 * 4), dtype=np.uint8)
+        buffer[:, :width] = region
+        image = QImage(buffer.data, width, height, buffer.shape[1], QImage.Format.Format_Indexed8)
+        image.setColorTable(COLOR_TABLE)
+        painter.drawImage(int(left), int(top), image)
+
+    def wheelEvent(self, event):
+        if self.matrix is None:
+            return
+        # Zoom around the cursor, between the whole matrix and MAX_CELL_SIZE pixels per cell
+        position = event.position()
+        factor = 1.25 if event.angleDelta().y() > 0 else 0.8
+        fit_scale = min(self.width(), self.height()) / max(len(self.matrix), 1)
+        scale = min(max(self.scale * factor, fit_scale), self.MAX_CELL_SIZE)
+        self.offset_x = position.x() - (position.x() - self.offset_x) * scale / self.scale
+        self.offset_y = position.y() - (position.y() - self.offset_y) * scale / self.scale
+        self.scale = scale
+        self.update()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.drag_start = (event.position(), self.offset_x, self.offset_y)
+
+    def mouseReleaseEvent(self, event):
+        self.drag_start = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.fit()
+
+    def mouseMoveEvent(self, event):
+        position = event.position()
+        if self.drag_start is not None:
+            start, offset_x, offset_y = self.drag_start
+            self.offset_x = offset_x + position.x() - start.x()
+            self.offset_y = offset_y + position.y() - start.y()
+            self.update()
+            return
+
+        cell = self.cell_at(position.x(), position.y())
+        if cell is None:
+            QToolTip.hideText()
+            return
+        row, column = cell
+        text = f"{self.names[row]} / {self.names[column]}: {float(self.matrix[row, column]):.2f}"
+        QToolTip.showText(event.globalPosition().toPoint(), text, self)
+        self.hovered.emit(text)
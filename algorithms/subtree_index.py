@@ -0,0 +1,57 @@
+import ast
+from collections import Counter
+from algorithms.ast_comparator import ASTComparator
+
+
+class SubtreeIndex:
+    """
+    Corpus-wide index of normalized AST subtree hashes (see ASTComparator.subtree_hashes).
+
+    Every subtree of at least `min_size` nodes is posted to `index` as hash -> (file,
+    position), so renamed variables or changed constants still match, and so do shared
+    blocks below the function level. The shared-structure score of every pair comes
+    from one join over the posting lists instead of pairwise tree comparisons.
+    """
+
+    def __init__(self, min_size=5, max_postings=None):
+        self.min_size = min_size
+        self.max_postings = max_postings  # Ignore subtrees found in more files than this (boilerplate)
+        self.ast_comparator = ASTComparator()
+        self.names = []
+        self.subtree_counts = {}
+        self.index = {}
+
+    def add(self, name, code, language='python', tree=None):
+        """Indexes one submission; C++ and unparsable submissions have no tree and index nothing."""
+        subtrees = []
+        if language == 'python':
+            try:
+                subtrees = self.ast_comparator.subtree_hashes(tree or ast.parse(code), self.min_size)
+            except SyntaxError:
+                pass
+        self.names.append(name)
+        self.subtree_counts[name] = len(subtrees)
+        for digest, _, position in subtrees:
+            self.index.setdefault(digest, []).append((name, position))
+
+    def shared_subtree_counts(self):
+        """
+        Returns {(file1, file2): number of shared subtrees}, counting a subtree found m and n
+        times in the two files min(m, n) times, with each pair ordered by insertion order.
+        """
+        order = {name: index for index, name in enumerate(self.names)}
+        counts = Counter()
+        for postings in self.index.values():
+            files = Counter(order[name] for name, _ in postings)
+            if len(files) < 2 or (self.max_postings and len(files) > self.max_postings):
+                continue
+            ordered = sorted(files)
+            for i in range(len(ordered)):
+                for j in range(i + 1, len(ordered)):
+                    counts[(ordered[i], ordered[j])] += min(files[ordered[i]], files[ordered[j]])
+        return {(self.names[i], self.names[j]): counts[(i, j)] for i, j in sorted(counts)}
+
+    def shared_structure_scores(self):
+        """Returns {(file1, file2): shared subtrees / subtrees of the larger file} for every pair sharing any."""
+        return {(file1, file2): shared / max(self.subtree_counts[file1], self.subtree_counts[file2])
+                for (file1, file2), shared in self.shared_subtree_counts().items()}
@@ -1,36 +1,138 @@
 import tokenize
-from io import StringIO
+from array import array
 import keyword
+import zlib
+import numpy as np
+from algorithms import cpp_lexer, python_lexer
 
 
-class EnhancedTokenizer:
+def language_of(filename):
+    """Source language of a submission, from its file extension."""
+    return 'cpp' if filename.endswith('.cpp') else 'python'
+
+
+def token_offsets(code, raw_tokens):
+    """
+    Returns the (start, end) character offsets of every raw token of the code. The lexers
+    only skip whitespace and line continuations between tokens, so each token is the next
+    occurrence of its string; tokens without text (DEDENT, the final NEWLINE) are empty
+    spans where the scan stands.
+    """
+    offsets = []
+    position = 0
+    for _, string in raw_tokens:
+        start = code.find(string, position) if string else position
+        if start < 0:
+            start = position
+        position = start + len(string)
+        offsets.append((start, position))
+    return offsets
+
+
+class TokenVocabulary:
+    """
+    Maps every distinct normalized (type, string) token to a small integer, so that a
+    submission is stored as an array('H') of token ids instead of a list of tuples.
+    Because names, numbers, strings and comments are normalized the vocabulary stays
+    in the hundreds, far below the 65536 ids an unsigned short can hold.
+    """
+
     def __init__(self):
+        self.ids = {}
+        self.strings = []  # Token string of every id
+
+    def intern(self, token):
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids[token] = len(self.strings)
+            self.strings.append(token[1])
+        return token_id
+
+    def encode(self, tokens):
+        return array('H', map(self.intern, tokens))
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class EnhancedTokenizer:
+    def __init__(self, vocabulary=None):
         self.keywords = set(keyword.kwlist)
+        # Shared by every submission tokenized here
+        self.vocabulary = vocabulary if vocabulary is not None else TokenVocabulary()
+        self._kgram_hashes = {}
+
+    def lex(self, code, language='python'):
+        """
+        Returns the raw (type, string) tokens of the code. The Python regex lexer gives the
+        same tokens as tokenize.generate_tokens, faster and without raising on the incomplete
+        or mis-indented code students submit; C++ is lexed into the same token types.
+        """
+        if language == 'cpp':
+            return cpp_lexer.generate_tokens(code)
+        return python_lexer.generate_tokens(code)
 
-    def tokenize_code(self, code):
+    def tokenize_code(self, code, language='python'):
+        return self.normalize(self.lex(code, language), language)
+
+    def normalize(self, raw_tokens, language='python'):
+        """Normalizes raw tokens into the alphabet shared by both languages."""
+        keywords = cpp_lexer.KEYWORDS if language == 'cpp' else self.keywords
         tokens = []
-        reader = StringIO(code).readline
-        for token in tokenize.generate_tokens(reader):
-            if token.type == tokenize.NAME:
-                if token.string in self.keywords:
-                    tokens.append((token.type, token.string))
+        for token_type, string in raw_tokens:
+            if token_type == tokenize.NAME:
+                if string in keywords:
+                    tokens.append((token_type, string))
                 else:
-                    tokens.append((token.type, "_name"))  # Normalize variable and function names
-            elif token.type == tokenize.NUMBER:
-                tokens.append((token.type, "_number"))  # Normalize all numbers
-            elif token.type == tokenize.STRING:
-                tokens.append((token.type, "_string"))  # Normalize all strings
-            elif token.type == tokenize.COMMENT:
-                tokens.append((token.type, "_comment"))  # Normalize comments
+                    tokens.append((token_type, "_name"))  # Normalize variable and function names
+            elif token_type == tokenize.NUMBER:
+                tokens.append((token_type, "_number"))  # Normalize all numbers
+            elif token_type == tokenize.STRING:
+                tokens.append((token_type, "_string"))  # Normalize all strings
+            elif token_type == tokenize.COMMENT:
+                tokens.append((token_type, "_comment"))  # Normalize comments
             else:
-                tokens.append((token.type, token.string))
+                tokens.append((token_type, string))
         return tokens
 
+    def normalized_tokens(self, code, language='python'):
+        """Returns the normalized token strings."""
+        return [string for _, string in self.tokenize_code(code, language)]
+
+    def token_ids(self, code, language='python'):
+        """Returns the normalized tokens of the code as an array('H') of vocabulary ids."""
+        return self.vocabulary.encode(self.tokenize_code(code, language))
+
+    def kgram_hashes(self, token_ids, k):
+        """
+        Returns the 32-bit hash of every k-gram of a token id array: the crc32 of its token
+        strings, so the hashes do not depend on the order ids were assigned in. The hash of
+        each distinct k-gram is computed once.
+        """
+        size = min(k, len(token_ids)) or 1
+        strings = self.vocabulary.strings
+        hashes = []
+        for i in range(max(len(token_ids) - size + 1, 1)):
+            kgram = token_ids[i:i + size]
+            key = kgram.tobytes()
+            kgram_hash = self._kgram_hashes.get(key)
+            if kgram_hash is None:
+                kgram_hash = self._kgram_hashes[key] = zlib.crc32(
+                    '\x00'.join(strings[token_id] for token_id in kgram).encode('utf-8'))
+            hashes.append(kgram_hash)
+        return hashes
+
     def compare_tokens(self, code1, code2):
         tokens1 = self.tokenize_code(code1)
         tokens2 = self.tokenize_code(code2)
         return self._token_similarity(tokens1, tokens2)
 
     def _token_similarity(self, tokens1, tokens2):
-        match_count = sum(1 for t1, t2 in zip(tokens1, tokens2) if t1 == t2)
+        if isinstance(tokens1, array) and isinstance(tokens2, array):
+            # Token id arrays are compared position by position in one vectorized step
+            length = min(len(tokens1), len(tokens2))
+            match_count = int(np.count_nonzero(
+                np.frombuffer(tokens1, dtype=np.uint16)[:length] == np.frombuffer(tokens2, dtype=np.uint16)[:length]))
+        else:
+            match_count = sum(1 for t1, t2 in zip(tokens1, tokens2) if t1 == t2)
         return match_count / max(len(tokens1), len(tokens2))
@@ -0,0 +1,106 @@
+from bisect import bisect_left
+from collections import Counter
+from algorithms.tokenizer import EnhancedTokenizer
+
+
+class WinnowingIndex:
+    """
+    MOSS-style document fingerprinting with an inverted index.
+
+    Every submission is tokenized once, its k-gram hashes are winnowed down to a
+    fingerprint set, and each fingerprint is posted to `index` as (file, position).
+    Candidate pairs and shared-fingerprint counts come from walking the posting
+    lists, so the cost is proportional to the number of shared fingerprints rather
+    than to the number of pairs.
+    """
+
+    def __init__(self, k=5, window=4, max_postings=None):
+        self.k = k
+        self.window = window
+        self.max_postings = max_postings  # Ignore fingerprints shared by more files than this (boilerplate)
+        self.tokenizer = EnhancedTokenizer()
+        self.names = []
+        self.fingerprints = {}
+        self.index = {}
+
+    def kgram_hashes(self, token_ids):
+        """Returns the 32-bit hash of every k-gram of a token id array."""
+        return self.tokenizer.kgram_hashes(token_ids, self.k)
+
+    def winnow(self, hashes):
+        """
+        Selects the minimum hash of every window of `window` consecutive k-gram hashes
+        (the rightmost one on ties) and returns the distinct (hash, position) picks.
+        """
+        if len(hashes) <= self.window:
+            position = min(range(len(hashes)), key=lambda i: (hashes[i], -i))
+            return [(hashes[position], position)]
+
+        fingerprints = []
+        last_position = -1
+        for start in range(len(hashes) - self.window + 1):
+            position = start
+            for i in range(start + 1, start + self.window):
+                if hashes[i] <= hashes[position]:
+                    position = i
+            if position != last_position:
+                fingerprints.append((hashes[position], position))
+                last_position = position
+        return fingerprints
+
+    def add(self, name, code, language='python'):
+        fingerprints = self.winnow(self.kgram_hashes(self.tokenizer.token_ids(code, language)))
+        self.names.append(name)
+        self.fingerprints[name] = fingerprints
+        for fingerprint, position in fingerprints:
+            self.index.setdefault(fingerprint, []).append((name, position))
+
+    def shared_fingerprint_counts(self):
+        """
+        Returns {(file1, file2): number of distinct shared fingerprints}, with each pair
+        ordered by insertion order.
+        """
+        order = {name: index for index, name in enumerate(self.names)}
+        counts = Counter()
+        for postings in self.index.values():
+            files = sorted({order[name] for name, _ in postings})
+            if len(files) < 2 or (self.max_postings and len(files) > self.max_postings):
+                continue
+            for i in range(len(files)):
+                for j in range(i + 1, len(files)):
+                    counts[(files[i], files[j])] += 1
+        return {(self.names[i], self.names[j]): counts[(i, j)] for i, j in sorted(counts)}
+
+    def matched_regions(self, name1, name2, should_cancel=None):
+        """
+        Returns the matched token regions of two indexed files as a list of
+        ((start1, end1), (start2, end2)) half-open token spans, merging overlapping k-grams.
+        Each fingerprint of the first file is paired with one occurrence in the second: the
+        one that continues the current region, or else the first, so fingerprints repeated
+        in both files do not pair every occurrence with every other.
+        should_cancel is polled every few hundred fingerprints; None is returned once it is true.
+        """
+        positions2 = {}
+        for fingerprint, position in self.fingerprints[name2]:
+            positions2.setdefault(fingerprint, []).append(position)
+
+        regions = []
+        for count, (fingerprint, position1) in enumerate(self.fingerprints[name1]):
+            if should_cancel is not None and count % 256 == 0 and should_cancel():
+                return None
+            candidates = positions2.get(fingerprint)
+            if not candidates:
+                continue
+            if regions:
+                (start1, end1), (start2, end2) = regions[-1]
+                if position1 <= end1:
+                    # Occurrences are in position order, so the first one past start2 decides
+                    i = bisect_left(candidates, start2)
+                    if i < len(candidates) and candidates[i] <= end2:
+                        position2 = candidates[i]
+                        regions[-1] = ((start1, max(end1, position1 + self.k)),
+                                       (start2, max(end2, position2 + self.k)))
+                        continue
+            position2 = candidates[0]
+            regions.append(((position1, position1 + self.k), (position2, position2 + self.k)))
+        return regions
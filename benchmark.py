@@ -0,0 +1,45 @@
+"""
+Benchmarks CheatingDetector.analyze on the DataSet corpus with an increasing number
+of scoring processes and prints the wall time and speedup of each run.
+
+Usage: python benchmark.py [folder] [max_workers]
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+from algorithms.cheating_detector import CheatingDetector
+
+
+def run(folder, workers):
+    detector = CheatingDetector(folder, workers=workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Silence the per-pair debug output
+        results = detector.analyze()
+    return time.perf_counter() - start, results
+
+
+def flagged_pairs(results):
+    # ResultSet and PairResult compare by identity, so the runs are compared by their values
+    return [(result.file1, result.file2, result.overall_score) for result in results]
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DataSet')
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    worker_counts = sorted({1, max_workers} | {2 ** i for i in range(1, max_workers.bit_length()) if 2 ** i < max_workers})
+    baseline_time, baseline_results = run(folder, 1)
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    print(f"{1:>8} {baseline_time:>10.2f} {1.0:>8.2f}")
+
+    for workers in worker_counts[1:]:
+        elapsed, results = run(folder, workers)
+        if flagged_pairs(results) != flagged_pairs(baseline_results):
+            print(f"Results with {workers} workers differ from the sequential run!")
+        print(f"{workers:>8} {elapsed:>10.2f} {baseline_time / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
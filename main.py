@@ -1,14 +1,38 @@
 import sys
-from PyQt6.QtCore import Qt
+import time
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget, QFileDialog, QListWidget, QListWidgetItem
+    QApplication, QMainWindow, QPushButton, QVBoxLayout, QHBoxLayout, QWidget, QFileDialog, QListWidget,
+    QProgressBar, QLabel, QTableView, QHeaderView, QLineEdit, QDoubleSpinBox, QSlider, QTabWidget
 )
-from algorithms.cheating_detector import CheatingDetector
+from algorithms.cheating_detector import CheatingDetector, DEFAULT_WEIGHTS, DEFAULT_THRESHOLD
+from algorithms.results_table_model import ResultsTableModel, STRUCTURE_COLUMN
+from algorithms.similarity_heatmap import HeatmapWidget, similarity_matrix
 from Utils.excel_exporter import ExcelExporter
 from algorithms.code_comparison_dialog import CodeComparisonDialog  # Import the new dialog class
 from PyQt6.QtGui import QFont
 
 
+class DetectionThread(QThread):
+    """
+    Runs the detector off the GUI thread. Progress and flagged pairs are emitted as the
+    run goes on; requestInterruption() cancels it after the current batch of pairs.
+    """
+    progress = pyqtSignal(int, int)  # Pairs done, pairs total
+    result_found = pyqtSignal(object)  # PairResult
+    completed = pyqtSignal(object, bool)  # ResultSet, partial when cancelled; whether it was cancelled
+
+    def __init__(self, detector, parent=None):
+        super().__init__(parent)
+        self.detector = detector
+
+    def run(self):
+        results = self.detector.get_results(progress=self.progress.emit, on_result=self.result_found.emit,
+                                            should_cancel=self.isInterruptionRequested)
+        # The request flag is reset once the thread ends, so it is read here
+        self.completed.emit(results, self.isInterruptionRequested())
+
+
 class CheatingDetectionApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -17,6 +41,8 @@ class CheatingDetectionApp(QMainWindow):
 
         self.detector = None
         self.folder_path = ""  # Store the selected folder path
+        self.detection_thread = None
+        self.progress_start = None  # (time, pairs done) of the first progress report, for the ETA
 
         # Central widget
         central_widget = QWidget()
@@ -42,11 +68,91 @@ class CheatingDetectionApp(QMainWindow):
         self.btn_export_excel_students.clicked.connect(self.export_for_students)
         layout.addWidget(self.btn_export_excel_students)
 
-        # Output box
+        # Progress of the running detection
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar(self)
+        progress_layout.addWidget(self.progress_bar)
+        self.progress_label = QLabel("", self)
+        progress_layout.addWidget(self.progress_label)
+        self.btn_cancel = QPushButton("Cancel", self)
+        self.btn_cancel.setEnabled(False)
+        self.btn_cancel.clicked.connect(self.cancel_detection)
+        progress_layout.addWidget(self.btn_cancel)
+        layout.addLayout(progress_layout)
+
+        # Output box for messages
         self.output_box = QListWidget(self)
         self.output_box.setFont(QFont("Arial", 11))
+        self.output_box.setMaximumHeight(100)
         layout.addWidget(self.output_box)
 
+        # Score weights and threshold; changing them flags the stored scores of the last run again
+        rescore_layout = QHBoxLayout()
+        self.weight_boxes = []
+        for label, weight in zip(("Text", "AST", "Token", "Levenshtein"), DEFAULT_WEIGHTS):
+            rescore_layout.addWidget(QLabel(label, self))
+            weight_box = QDoubleSpinBox(self)
+            weight_box.setRange(0.0, 1.0)
+            weight_box.setSingleStep(0.05)
+            weight_box.setValue(weight)
+            weight_box.valueChanged.connect(self.rescore)
+            rescore_layout.addWidget(weight_box)
+            self.weight_boxes.append(weight_box)
+        self.threshold_label = QLabel(f"Threshold {DEFAULT_THRESHOLD:.2f}", self)
+        rescore_layout.addWidget(self.threshold_label)
+        self.threshold_slider = QSlider(Qt.Orientation.Horizontal, self)
+        self.threshold_slider.setRange(0, 100)
+        self.threshold_slider.setValue(round(DEFAULT_THRESHOLD * 100))
+        self.threshold_slider.valueChanged.connect(self.rescore)
+        rescore_layout.addWidget(self.threshold_slider)
+        layout.addLayout(rescore_layout)
+
+        # Filters of the flagged pairs
+        filter_layout = QHBoxLayout()
+        self.student_filter = QLineEdit(self)
+        self.student_filter.setPlaceholderText("Filter by student")
+        self.student_filter.textChanged.connect(self.apply_filter)
+        filter_layout.addWidget(self.student_filter)
+        filter_layout.addWidget(QLabel("Min overall score", self))
+        self.min_score_filter = QDoubleSpinBox(self)
+        self.min_score_filter.setRange(0.0, 1.0)
+        self.min_score_filter.setSingleStep(0.05)
+        self.min_score_filter.valueChanged.connect(self.apply_filter)
+        filter_layout.addWidget(self.min_score_filter)
+        layout.addLayout(filter_layout)
+
+        # Flagged pairs; the view only asks the model for the visible rows, so every row gets
+        # the same fixed height instead of being measured
+        self.results_model = ResultsTableModel(self)
+        self.results_view = QTableView(self)
+        self.results_view.setModel(self.results_model)
+        self.results_view.setFont(QFont("Arial", 11))
+        self.results_view.setSortingEnabled(True)
+        self.results_view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.results_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.results_view.verticalHeader().hide()
+        self.results_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.results_view.horizontalHeader().setStretchLastSection(True)
+        self.results_view.clicked.connect(self.on_result_clicked)  # Connected once, not on every run
+        self.results_model.modelReset.connect(self.update_columns)
+        self.update_columns()
+
+        # Heatmap of the scores of every scored pair, built when its tab is shown
+        heatmap_panel = QWidget(self)
+        heatmap_layout = QVBoxLayout(heatmap_panel)
+        self.heatmap = HeatmapWidget(heatmap_panel)
+        heatmap_layout.addWidget(self.heatmap)
+        self.heatmap_label = QLabel("Wheel to zoom, drag to pan, double-click to show everything", heatmap_panel)
+        self.heatmap.hovered.connect(self.heatmap_label.setText)
+        heatmap_layout.addWidget(self.heatmap_label)
+        self.heatmap_outdated = True
+
+        self.tabs = QTabWidget(self)
+        self.tabs.addTab(self.results_view, "Flagged pairs")
+        self.tabs.addTab(heatmap_panel, "Heatmap")
+        self.tabs.currentChanged.connect(self.update_heatmap)
+        layout.addWidget(self.tabs)
+
     def select_folder(self):
         folder_path = QFileDialog.getExistingDirectory(self, "Select Homework Folder")
         if folder_path:
@@ -58,42 +164,152 @@ class CheatingDetectionApp(QMainWindow):
             self.output_box.addItem("No folder selected!")
             return
 
-        self.detector = CheatingDetector(self.folder_path)
-        report = self.detector.get_cheating_report()
+        if self.detection_thread is not None and self.detection_thread.isRunning():
+            return
+
+        # Keep the detector of the same folder so an unchanged folder reuses its results
+        if not self.detector or self.detector.reader.directory != self.folder_path:
+            # Exact Levenshtein scores for every pair, so moving the weights or the threshold
+            # only re-flags stored scores and never computes distances on the GUI thread
+            self.detector = CheatingDetector(self.folder_path, prune_levenshtein=False)
+        self.detector.weights = self.current_weights()
+        self.detector.threshold = self.current_threshold()
 
         self.output_box.clear()  # Clear previous output
-        for line in report:
-            # Create a QListWidgetItem for each line
-            item = QListWidgetItem(line)
-            item.setData(Qt.ItemDataRole.UserRole, line)
-            self.output_box.addItem(item)
-
-        # Connect item clicked signal to handler
-        self.output_box.itemClicked.connect(self.on_item_clicked)
-
-    def on_item_clicked(self, item):
-        # Get the message from the clicked item
-        message = item.data(Qt.ItemDataRole.UserRole)
-
-        # Extract the file names from the message
-        part1 = message.split(' between ')[1].split(' and ')
-        file1 = part1[0]
-        file2 = part1[1].split(' with ')[0]
-
-        # Read the content of the files using the full path
-        code1 = self.get_file_content(file1)
-        code2 = self.get_file_content(file2)
-
-        # Open the comparison dialog with filenames
-        dialog = CodeComparisonDialog(code1, code2, file1, file2, self)
+        self.results_model.clear()
+        self.progress_bar.setValue(0)
+        self.progress_label.setText("Reading files...")
+        self.progress_start = None
+        self.set_running(True)
+
+        # Detection runs on a worker thread so the window stays responsive; flagged pairs
+        # are listed as they are found
+        self.detection_thread = DetectionThread(self.detector, self)
+        self.detection_thread.progress.connect(self.on_progress)
+        self.detection_thread.result_found.connect(self.results_model.append_result)
+        self.detection_thread.completed.connect(self.on_detection_finished)
+        self.detection_thread.start()
+
+    def set_running(self, running):
+        """Only Cancel can be used while a detection runs; the weights and threshold are those of the run."""
+        self.btn_cancel.setEnabled(running)
+        for widget in (self.btn_select_folder, self.btn_run_detection, self.btn_export_excel,
+                       self.btn_export_excel_students, self.threshold_slider, *self.weight_boxes):
+            widget.setEnabled(not running)
+
+    def cancel_detection(self):
+        if self.detection_thread is not None and self.detection_thread.isRunning():
+            self.detection_thread.requestInterruption()
+            self.btn_cancel.setEnabled(False)
+            self.progress_label.setText("Cancelling...")
+
+    def on_progress(self, done, total):
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+
+        # The ETA follows the rate since the first report, which already counts the reused pairs
+        now = time.monotonic()
+        if self.progress_start is None:
+            self.progress_start = (now, done)
+        start_time, start_done = self.progress_start
+        text = f"{done} / {total} pairs"
+        if done > start_done and done < total:
+            remaining = (total - done) * (now - start_time) / (done - start_done)
+            text += f", ETA {int(remaining) // 60}:{int(remaining) % 60:02d}"
+        self.progress_label.setText(text)
+
+    def on_detection_finished(self, results, cancelled):
+        self.set_running(False)
+        self.progress_label.setText("Cancelled" if cancelled else "Done")
+
+        # Show the final results, streamed or reused from the last run, in the current sort order
+        self.results_model.set_results(results)
+        self.heatmap_outdated = True
+        self.update_heatmap()
+        if not results:
+            self.output_box.addItem("No potential cheating detected.")
+        else:
+            self.output_box.addItem(f"{len(results)} pairs flagged.")
+        if cancelled:
+            self.output_box.addItem("Detection cancelled; run it again to continue where it stopped.")
+
+    def current_weights(self):
+        return tuple(weight_box.value() for weight_box in self.weight_boxes)
+
+    def current_threshold(self):
+        return self.threshold_slider.value() / 100
+
+    def rescore(self):
+        # Re-flags the scores kept from the last run, without running the detection again
+        self.threshold_label.setText(f"Threshold {self.current_threshold():.2f}")
+        if self.detector is None or self.detector.pair_scores is None:
+            return
+        if self.detection_thread is not None and self.detection_thread.isRunning():
+            return
+        results = self.detector.rescore(self.current_weights(), self.current_threshold())
+        self.results_model.set_results(results)
+        self.heatmap_outdated = True
+        self.update_heatmap()
+
+    def update_heatmap(self):
+        # Rebuilt only while the heatmap is shown, and only after the scores or weights changed
+        if self.tabs.currentIndex() != 1 or not self.heatmap_outdated:
+            return
+        if self.detector is None or self.detector.pair_scores is None:
+            return
+        if self.detection_thread is not None and self.detection_thread.isRunning():
+            return
+        names, matrix = similarity_matrix(self.detector.reader.names, self.detector.pair_scores,
+                                          self.current_weights())
+        self.heatmap.set_matrix(names, matrix)
+        self.heatmap_outdated = False
+
+    def update_columns(self):
+        # The shared-structure score only exists in the subtree candidate mode
+        self.results_view.setColumnHidden(STRUCTURE_COLUMN, self.results_model.column_empty(STRUCTURE_COLUMN))
+
+    def apply_filter(self):
+        self.results_model.set_filter(min_score=self.min_score_filter.value(),
+                                      student=self.student_filter.text().strip())
+
+    def on_result_clicked(self, index):
+        # Get the pair result of the clicked row
+        result = self.results_model.result(index.row())
+        file1, file2 = result.file1, result.file2
+
+        # Take the sources from the analyzed corpus instead of reading them again
+        code1 = self.get_code(file1)
+        code2 = self.get_code(file2)
+
+        # Open the comparison dialog with filenames; matches use the detector's fingerprint settings
+        dialog = CodeComparisonDialog(code1, code2, file1, file2, self,
+                                      k=self.detector.winnowing_k, window=self.detector.winnowing_window)
         dialog.exec()
 
-    def export_to_excel(self):
+    def results_up_to_date(self):
+        """
+        Whether the detector's results can be exported as they are. Only files whose size
+        or modification time changed are hashed again, and the exporters are given the
+        results checked here, so they neither check the folder nor run the detection again.
+        """
         if not self.detector:
             self.output_box.addItem("No detection run yet!")
+            return False
+        if self.detector.results_fingerprint is None:
+            self.output_box.addItem("Detection was cancelled; run it to completion before exporting.")
+            return False
+        if self.detector.results_fingerprint != self.detector.reader.fingerprint():
+            # Files were added, removed or changed since the last run: detect again on the worker thread
+            self.run_detection()
+            self.output_box.addItem("Files changed since the last detection; export again once it has finished.")
+            return False
+        return True
+
+    def export_to_excel(self):
+        if not self.results_up_to_date():
             return
 
-        excel_exporter = ExcelExporter(self.detector, self.folder_path)  # Pass the detector to the ExcelExporter
+        excel_exporter = ExcelExporter(self.detector, self.folder_path, self.detector.detailed_results)
         save_path, _ = QFileDialog.getSaveFileName(self, "Save Report As", "", "Excel Files (*.xlsx)")
 
         if save_path:
@@ -101,11 +317,10 @@ class CheatingDetectionApp(QMainWindow):
             self.output_box.addItem(f"Report saved to: {save_path}")
 
     def export_for_students(self):
-        if not self.detector:
-            self.output_box.addItem("No detection run yet!")
+        if not self.results_up_to_date():
             return
 
-        excel_exporter = ExcelExporter(self.detector, self.folder_path)
+        excel_exporter = ExcelExporter(self.detector, self.folder_path, self.detector.detailed_results)
 
         try:
             save_path, _ = QFileDialog.getSaveFileName(self, "Save Student Report As", "", "Excel Files (*.xlsx)")
@@ -123,6 +338,21 @@ class CheatingDetectionApp(QMainWindow):
             print(f"Error during export: {e}")
             self.output_box.addItem(f"Error during export: {e}")
 
+    def closeEvent(self, event):
+        # Stop a running detection before the window goes away
+        if self.detection_thread is not None and self.detection_thread.isRunning():
+            self.detection_thread.requestInterruption()
+            self.detection_thread.wait()
+        super().closeEvent(event)
+
+    def get_code(self, filename):
+        # Source of a submission as analyzed, falling back to the file on disk
+        if self.detector is not None and self.detector.similarity_detector is not None:
+            code = self.detector.similarity_detector.files.get(filename)
+            if code is not None:
+                return code
+        return self.get_file_content(filename)
+
     def get_file_content(self, filename):
         # Construct the full path using the selected folder path and the filename
         full_path = f"{self.folder_path}/{filename}"
@@ -0,0 +1,111 @@
+"""
+Equivalence of the fast edit distances with the reference DP levenshtein_distance.
+
+Run with: python -m pytest tests
+"""
+import random
+import pytest
+from algorithms.levenshtein import (levenshtein_distance, myers_levenshtein_distance,
+                                    bounded_levenshtein_distance, similarity_score)
+
+# Small alphabets give close strings, the unicode one has accents, CJK and astral characters
+ALPHABETS = ['ab', 'abcd', 'def (x):\n\treturn', 'aé中😀́b']
+MIN_SIMILARITIES = [0.0, 0.3, 0.5, 0.7, 0.8, 0.9, 0.95, 1.0]
+
+
+def random_string(rng, alphabet, max_length):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+
+
+def mutated(rng, text, alphabet, edits):
+    """text with a few random insertions, deletions and substitutions."""
+    characters = list(text)
+    for _ in range(edits):
+        position = rng.randint(0, len(characters))
+        operation = rng.randrange(3)
+        if operation == 0:
+            characters.insert(position, rng.choice(alphabet))
+        elif characters and position < len(characters):
+            if operation == 1:
+                del characters[position]
+            else:
+                characters[position] = rng.choice(alphabet)
+    return ''.join(characters)
+
+
+def string_pairs(seed, count, max_length):
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        alphabet = rng.choice(ALPHABETS)
+        s1 = random_string(rng, alphabet, max_length)
+        if rng.random() < 0.5:
+            s2 = random_string(rng, alphabet, max_length)
+        else:
+            s2 = mutated(rng, s1, alphabet, rng.randint(0, 10))
+        pairs.append((s1, s2))
+    return pairs
+
+
+# Random pairs, short enough for the reference DP, plus some longer than a 64-bit word
+PAIRS = string_pairs(seed=1, count=400, max_length=40) + string_pairs(seed=2, count=30, max_length=300)
+
+# Empty, equal and unicode edge cases
+EDGE_PAIRS = [
+    ('', ''),
+    ('', 'a'),
+    ('abc', ''),
+    ('same', 'same'),
+    ('x' * 200, 'x' * 200),
+    ('kitten', 'sitting'),
+    ('flaw', 'lawn'),
+    ('café', 'cafe'),
+    ('é', 'é'),
+    ('😀😀😀', '😀😃😀'),
+    ('中文代码', '中文程序代码'),
+]
+
+
+@pytest.mark.parametrize('s1, s2', EDGE_PAIRS + PAIRS)
+def test_myers_matches_reference(s1, s2):
+    assert myers_levenshtein_distance(s1, s2) == levenshtein_distance(s1, s2)
+    assert myers_levenshtein_distance(s2, s1) == levenshtein_distance(s1, s2)
+
+
+@pytest.mark.parametrize('s1, s2', EDGE_PAIRS + PAIRS)
+def test_bounded_matches_reference(s1, s2):
+    distance = levenshtein_distance(s1, s2)
+    for max_distance in range(0, distance + 3):
+        expected = distance if distance <= max_distance else None
+        assert bounded_levenshtein_distance(s1, s2, max_distance) == expected
+        assert bounded_levenshtein_distance(s2, s1, max_distance) == expected
+
+
+@pytest.mark.parametrize('s1, s2', EDGE_PAIRS + PAIRS)
+def test_myers_with_max_distance_matches_reference(s1, s2):
+    distance = levenshtein_distance(s1, s2)
+    for max_distance in range(0, distance + 3):
+        expected = distance if distance <= max_distance else None
+        assert myers_levenshtein_distance(s1, s2, max_distance) == expected
+        assert myers_levenshtein_distance(s2, s1, max_distance) == expected
+
+
+@pytest.mark.parametrize('s1, s2', [pair for pair in EDGE_PAIRS + PAIRS if pair[0] or pair[1]])
+def test_similarity_score_matches_reference(s1, s2):
+    expected = 1 - levenshtein_distance(s1, s2) / max(len(s1), len(s2))
+    assert similarity_score(s1, s2) == expected
+
+    # Pruning may only give up on pairs below min_similarity; anything returned is exact
+    for min_similarity in MIN_SIMILARITIES:
+        score = similarity_score(s1, s2, min_similarity=min_similarity)
+        if expected >= min_similarity:
+            assert score == expected
+        assert score is None or score == expected
+
+
+def test_similarity_score_of_two_empty_strings_raises_like_before():
+    # The original similarity_score divided by the longest length as well
+    with pytest.raises(ZeroDivisionError):
+        similarity_score('', '')
+    with pytest.raises(ZeroDivisionError):
+        similarity_score('', '', min_similarity=0.5)
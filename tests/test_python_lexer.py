@@ -0,0 +1,80 @@
+"""
+Equivalence of the regex lexer with tokenize.generate_tokens, on the sample folders and on broken code.
+
+Run with: python -m pytest tests
+"""
+import os
+import tokenize
+from io import StringIO
+import pytest
+from algorithms.python_lexer import generate_tokens
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = [os.path.join(folder, filename) for folder in ['DataSet', 'homeworks']
+         if os.path.isdir(os.path.join(ROOT, folder))
+         for filename in sorted(os.listdir(os.path.join(ROOT, folder))) if filename.endswith('.py')]
+
+
+def tokenize_tokens(code):
+    """(type, string) tokens from tokenize, and the error it stopped on, if any."""
+    tokens = []
+    try:
+        for token in tokenize.generate_tokens(StringIO(code).readline):
+            tokens.append((token.type, token.string))
+    except (tokenize.TokenError, IndentationError, SyntaxError) as error:
+        return tokens, error
+    return tokens, None
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_sample_files_match_tokenize(path):
+    with open(os.path.join(ROOT, path), 'r', encoding='utf-8') as file:
+        code = file.read()
+    expected, error = tokenize_tokens(code)
+    if error is not None:
+        pytest.skip(f"tokenize rejects {path}: {error}")
+    assert generate_tokens(code) == expected
+
+
+# Code tokenize accepts, odd as it is
+ACCEPTED = {
+    'unterminated string': "x = 'abc\ny = 1\n",
+    'null byte': "x = 1\x00\ny = 2\n",
+    'unknown character': "x = 1 $ 2\n",
+    'tabs and spaces': "if x:\n\ta\n        b\n",
+    'no final newline': "x = 1",
+    'comment without newline': "x = 1\n# end",
+    'empty': "",
+    'crlf': "if x:\r\n    y = 1\r\n",
+    'continuation': "x = 1 + \\\n    2\n",
+    'f-string': "name = f'{a!r:>{width}}'\n",
+}
+
+# Code tokenize gives up on; the lexer must not raise and must agree up to that point
+REJECTED = {
+    'unterminated triple-quoted string': 'x = """abc\ny = 1\n',
+    'unterminated triple-quoted string at the end': "def f():\n    '''doc",
+    'inconsistent dedent': "if x:\n        a = 1\n    b = 2\n",
+    'unclosed bracket': "f(1,\n",
+    'unclosed bracket and string': "f('a',\n  'b",
+}
+
+
+@pytest.mark.parametrize('code', ACCEPTED.values(), ids=ACCEPTED.keys())
+def test_broken_code_tokenize_accepts(code):
+    expected, error = tokenize_tokens(code)
+    assert error is None
+    assert generate_tokens(code) == expected
+
+
+@pytest.mark.parametrize('code', REJECTED.values(), ids=REJECTED.keys())
+def test_broken_code_tokenize_rejects(code):
+    expected, error = tokenize_tokens(code)
+    assert error is not None
+    tokens = generate_tokens(code)
+    assert tokens[:len(expected)] == expected
+    assert tokens[-1] == (tokenize.ENDMARKER, '')
+
+
+def test_unterminated_triple_quoted_string_runs_to_the_end():
+    assert generate_tokens('x = """abc\ny = 1\n')[2] == (tokenize.STRING, '"""abc\ny = 1\n')
@@ -5,9 +5,15 @@ import os
 
 
 class ExcelExporter:
-    def __init__(self, detector, folder_path):
+    def __init__(self, detector, folder_path, results=None):
         self.detector = detector  # Store the cheating detection object
         self.folder_path = folder_path
+        self.results = results  # Results already checked against the folder; otherwise taken from the detector
+
+    def get_results(self):
+        if self.results is not None:
+            return self.results
+        return self.detector.get_results()
 
     def parse_filename(self, filename):
         """Extracts name and ID from the filename."""
@@ -36,29 +42,20 @@ class ExcelExporter:
 
         # Collect detailed cheating report
         detailed_reports = []
-        report = self.detector.get_cheating_report()
-
-        for line in report:
-            try:
-                if 'Possible cheating between' in line and 'with an overall score of' in line:
-                    parts = line.split(' between ')[1].split(' with an overall score of ')
-                    files = parts[0].split(' and ')
-                    file1, file2 = files[0].strip(), files[1].strip()
-
-                    similarity = float(parts[1].split(' and ML prediction')[0].strip())
-                    ml_prediction = 1
+        results = self.get_results()
 
-                    name1, id1 = self.parse_filename(file1)
-                    name2, id2 = self.parse_filename(file2)
+        for result in results:
+            # Scores are reported with two decimals
+            similarity = round(result.overall_score, 2)
 
-                    # Update cheating scores for the students involved in cheating
-                    students_scores[(name1, id1)] = max(students_scores.get((name1, id1), 0), similarity * 100)
-                    students_scores[(name2, id2)] = max(students_scores.get((name2, id2), 0), similarity * 100)
+            name1, id1 = self.parse_filename(result.file1)
+            name2, id2 = self.parse_filename(result.file2)
 
-                    detailed_reports.append((file1, file2, similarity, ml_prediction))
+            # Update cheating scores for the students involved in cheating
+            students_scores[(name1, id1)] = max(students_scores.get((name1, id1), 0), similarity * 100)
+            students_scores[(name2, id2)] = max(students_scores.get((name2, id2), 0), similarity * 100)
 
-            except Exception as e:
-                print(f"Error parsing line: {line} - {e}")
+            detailed_reports.append(result)
 
         # Prepare summary data
         summary_data = []
@@ -84,12 +81,7 @@ class ExcelExporter:
         summary_df = pd.DataFrame(summary_data, columns=['Name', 'ID', 'Actual Number', 'Cheat (%)', 'Final Grade'])
 
         # Prepare detailed report data
-        detailed_pairs_data = []
-        for file1, file2, score, ml_prediction in detailed_reports:
-            detailed_pairs_data.append(
-                f'Possible cheating between {file1} and {file2} '
-                f'with an overall score of {score:.2f} and ML prediction: {ml_prediction}'
-            )
+        detailed_pairs_data = [result.report_line() for result in detailed_reports]
 
         detailed_pairs_df = pd.DataFrame(detailed_pairs_data, columns=['Detailed Report'])
 
@@ -197,26 +189,18 @@ class ExcelExporter:
         students_scores = self.get_all_students()  # Initialize with all students having 0% cheating score
 
         # Collect detailed cheating report
-        report = self.detector.get_cheating_report()
-
-        for line in report:
-            try:
-                if 'Possible cheating between' in line and 'with an overall score of' in line:
-                    parts = line.split(' between ')[1].split(' with an overall score of ')
-                    files = parts[0].split(' and ')
-                    file1, file2 = files[0].strip(), files[1].strip()
-
-                    similarity = float(parts[1].split(' and ML prediction')[0].strip())
+        results = self.get_results()
 
-                    name1, id1 = self.parse_filename(file1)
-                    name2, id2 = self.parse_filename(file2)
+        for result in results:
+            # Scores are reported with two decimals
+            similarity = round(result.overall_score, 2)
 
-                    # Update cheating scores for students involved in cheating
-                    students_scores[(name1, id1)] = max(students_scores.get((name1, id1), 0), similarity * 100)
-                    students_scores[(name2, id2)] = max(students_scores.get((name2, id2), 0), similarity * 100)
+            name1, id1 = self.parse_filename(result.file1)
+            name2, id2 = self.parse_filename(result.file2)
 
-            except Exception as e:
-                print(f"Error parsing line: {line} - {e}")
+            # Update cheating scores for students involved in cheating
+            students_scores[(name1, id1)] = max(students_scores.get((name1, id1), 0), similarity * 100)
+            students_scores[(name2, id2)] = max(students_scores.get((name2, id2), 0), similarity * 100)
 
         # Prepare student data for export
         student_data = []